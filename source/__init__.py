@@ -1,5 +1,19 @@
 from .pieces import Piece, Pawn, Knight, Rook, Bishop, Queen, King
+from . import zobrist
 from .game import Board, Game, TurnError, InvalidMoveException
-from .main_menu import MainMenu, realpath
-from .game_gui import GameGui
-from .load_game import LoadGameWindow
+from .bitboard import BitBoard
+
+
+def __getattr__(name):
+    # The graphical interface is only imported when it's used, so the game can be played
+    # without tkinter and PIL
+    if name in ("MainMenu", "realpath"):
+        from . import main_menu
+        return getattr(main_menu, name)
+    if name == "GameGui":
+        from .game_gui import GameGui
+        return GameGui
+    if name == "LoadGameWindow":
+        from .load_game import LoadGameWindow
+        return LoadGameWindow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
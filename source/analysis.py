@@ -0,0 +1,141 @@
+"""
+Analysis of the positions of a game on a background thread
+
+The interface runs on the Tk thread, so anything slow done there freezes the window.
+AnalysisService runs those tasks, like the game status after a move or the search of a move,
+on a worker thread and gives their results back to the Tk thread.
+"""
+from queue import Queue, Empty
+import threading
+
+from source.game import Game
+from source.search import Search
+
+
+def get_status(game, stop_event):
+    """Task that returns the status of the game, see game.Game.status"""
+    return game.status
+
+
+def search_best_move(game, stop_event, time_limit=1.0):
+    """
+    Task that searches the best move of the turn player
+
+    Args:
+        game (game.Game)
+        stop_event (threading.Event): event set when the task is cancelled
+        time_limit (float): maximum duration of the search in seconds. Defaults to 1
+
+    Returns:
+        the move encoded as an integer (see moves.py), or None if the search was cancelled or
+        there isn't any valid move
+    """
+    result = Search(game, time_limit=time_limit, stop_event=stop_event).run()
+    if stop_event.is_set():
+        return None
+    return result.best_move
+
+
+class AnalysisService:
+    """
+    Runs analysis tasks of the positions of a game on a worker thread, so they don't block the
+    Tk mainloop
+
+    The tasks are sent to the worker through a queue with a snapshot of the game: its current
+    position in Forsyth-Edwards Notation, the captured pieces and the repetitions of the
+    positions. The worker rebuilds the game from the snapshot, so the game of the interface can
+    keep changing while a task runs, and the cost of the copy doesn't grow with the number of
+    moves played. The results come back through another queue, polled with after() on the Tk
+    thread, where the callbacks are called.
+
+    cancel discards the tasks submitted before it, which were for an older position: the
+    ones that didn't start are skipped, a running one is asked to stop through its stop event
+    and their results never reach the callbacks.
+
+    Args:
+        widget (tkinter.Misc): widget used to poll the results
+        poll_interval (int): milliseconds between the polls of the results. Defaults to 50
+
+    Attributes:
+        tasks (queue.Queue): tasks waiting for the worker
+        results (queue.Queue): results waiting for the Tk thread
+        generation (int): number of the current tasks, incremented when they're cancelled
+        stop_event (threading.Event): event of the current tasks, set when they're cancelled
+        thread (threading.Thread): worker thread
+    """
+    def __init__(self, widget, poll_interval=50):
+        self.__widget = widget
+        self.__poll_interval = poll_interval
+        self.__tasks = Queue()
+        self.__results = Queue()
+        self.__generation = 0
+        self.__stop_event = threading.Event()
+        self.__thread = threading.Thread(target=self.__work, daemon=True)
+        self.__thread.start()
+        self.__poll_id = widget.after(poll_interval, self.__poll)
+
+    def submit(self, game, task, callback, error_callback=None):
+        """
+        Run a task on the current position of a game
+
+        Args:
+            game (game.Game): game whose current position is analysed
+            task (Callable[[game.Game, threading.Event], object]): function called on the
+                worker thread with a copy of the game and an event set when the task is
+                cancelled, for example get_status
+            callback (Callable[[object], None]): function called on the Tk thread with the
+                value returned by the task, unless the task is cancelled
+            error_callback (Callable[[Exception], None]): function called on the Tk thread
+                with the exception raised by the task, unless the task is cancelled. Defaults
+                to None (the exception is raised on the Tk thread)
+        """
+        captured_pieces = {color: list(pieces) for color, pieces in game.captured_pieces.items()}
+        snapshot = (game.to_fen(), captured_pieces, game.history)
+        self.__tasks.put((self.__generation, self.__stop_event, snapshot, task,
+                          (callback, error_callback)))
+
+    def cancel(self):
+        """Cancel the tasks submitted until now"""
+        self.__stop_event.set()
+        self.__stop_event = threading.Event()
+        self.__generation += 1
+
+    def close(self):
+        """Cancel the tasks, stop the worker thread and the polling"""
+        self.cancel()
+        self.__tasks.put(None)
+        if self.__poll_id is not None:
+            self.__widget.after_cancel(self.__poll_id)
+            self.__poll_id = None
+
+    def __work(self):
+        while True:
+            item = self.__tasks.get()
+            if item is None:
+                return
+            generation, stop_event, snapshot, task, callbacks = item
+            if generation != self.__generation:
+                continue
+            result = error = None
+            try:
+                result = task(Game.from_fen(*snapshot), stop_event)
+            except Exception as exception:
+                error = exception
+            self.__results.put((generation, callbacks, result, error))
+
+    def __poll(self):
+        self.__poll_id = self.__widget.after(self.__poll_interval, self.__poll)
+        while True:
+            try:
+                generation, callbacks, result, error = self.__results.get_nowait()
+            except Empty:
+                return
+            if generation != self.__generation:
+                continue
+            callback, error_callback = callbacks
+            if error is None:
+                callback(result)
+            elif error_callback is not None:
+                error_callback(error)
+            else:
+                raise error
@@ -0,0 +1,336 @@
+from multipledispatch import dispatch
+
+from source import Pawn, Knight, Rook, Bishop, Queen, King
+from source import Board
+from source.pieces import colors, piece_types
+
+piece_classes = (Pawn, Knight, Bishop, Rook, Queen, King)
+
+# Squares are numbered line by line, so the square of a piece is line * 8 + column
+board_mask = (1 << 64) - 1
+
+
+def get_square(column, line):
+    return line * 8 + column
+
+
+def get_position(square):
+    return square % 8, square // 8
+
+
+def iterate_squares(bitboard):
+    """Yields the number of each square set in the bitboard, from the lowest to the highest"""
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+
+def _get_jump_attacks(deltas):
+    attacks = []
+    for square in range(64):
+        column, line = get_position(square)
+        mask = 0
+        for x, y in deltas:
+            target_column, target_line = column + x, line + y
+            if 0 <= target_column <= 7 and 0 <= target_line <= 7:
+                mask |= 1 << get_square(target_column, target_line)
+        attacks.append(mask)
+    return attacks
+
+
+def _get_rays(x, y):
+    rays = []
+    for square in range(64):
+        column, line = get_position(square)
+        mask = 0
+        column, line = column + x, line + y
+        while 0 <= column <= 7 and 0 <= line <= 7:
+            mask |= 1 << get_square(column, line)
+            column, line = column + x, line + y
+        rays.append(mask)
+    return rays
+
+
+# Attack masks of each square, built once when the module is imported
+knight_attacks = _get_jump_attacks(Knight.deltas)
+king_attacks = _get_jump_attacks(King.deltas)
+# Pawn attacks indexed by color and then square
+pawn_attacks = (_get_jump_attacks([(-1, -1), (1, -1)]), _get_jump_attacks([(-1, 1), (1, 1)]))
+# Rays indexed by direction and then square. A direction is positive if it goes to higher
+# square numbers, then the first piece on its ray is the lowest bit, otherwise the highest
+rays = {direction: _get_rays(*direction) for direction in Queen.directions}
+positive_directions = [(x, y) for x, y in Queen.directions if y > 0 or (y == 0 and x > 0)]
+
+
+def get_sliding_attacks(square, directions, occupancy):
+    """
+    Return the attack mask of a sliding piece
+
+    Args:
+        square (int): square of the piece
+        directions (List[Tuple[int, int]]): directions that the piece moves along
+        occupancy (int): bitboard of all the pieces on the board
+
+    Returns:
+        a bitboard with the squares reached by the piece, including the first occupied square
+        of each ray
+    """
+    attacks = 0
+    for direction in directions:
+        direction_rays = rays[direction]
+        ray = direction_rays[square]
+        blockers = ray & occupancy
+        if blockers:
+            if direction in positive_directions:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= direction_rays[blocker]
+        attacks |= ray
+    return attacks
+
+
+class BitBoard:
+    """
+    Compact board that keeps the pieces positions as bitboards
+
+    It has the same interface of game.Board, but each position takes twelve 64 bits integers,
+    one for each piece type of each color, plus occupancy masks. The pieces returned by get and
+    the other queries are created from the bitboards, so they aren't the same objects added to
+    the board. Use game.Board to play a game and BitBoard to store and search positions.
+
+    Attributes:
+        pieces (List[int]): bitboard of each piece type of each color, indexed by
+            color index * 6 + type index
+        occupancy (List[int]): bitboard of all the pieces of each color
+        moved (int): bitboard of the pieces that already moved
+    """
+    __slots__ = ("__pieces", "__occupancy", "__moved")
+
+    def __init__(self):
+        self.__pieces = [0] * 12
+        self.__occupancy = [0, 0]
+        self.__moved = 0
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Create a bitboard with the pieces of a board
+
+        Args:
+            board (game.Board)
+        """
+        bitboard = cls()
+        for piece in board:
+            bitboard.add(piece)
+        return bitboard
+
+    def to_board(self):
+        """Return a game.Board with the pieces of this bitboard"""
+        board = Board()
+        for piece in self:
+            board.add(piece)
+        return board
+
+    def __iter__(self):
+        occupancy = self.__occupancy[0] | self.__occupancy[1]
+        for square in iterate_squares(occupancy):
+            yield self.__create_piece(square)
+
+    def __eq__(self, other):
+        if not isinstance(other, BitBoard):
+            return NotImplemented
+        return self.__pieces == other.__pieces and self.__moved == other.__moved
+
+    def __hash__(self):
+        return hash((tuple(self.__pieces), self.__moved))
+
+    @property
+    def occupancy(self):
+        return self.__occupancy[0] | self.__occupancy[1]
+
+    def get_bitboard(self, piece_type, color):
+        """Return the bitboard of the pieces of a type and color"""
+        return self.__pieces[colors.index(color) * 6 + piece_types.index(piece_type)]
+
+    def get_occupancy(self, color):
+        """Return the bitboard of all the pieces of a color"""
+        return self.__occupancy[colors.index(color)]
+
+    def get(self, column, line):
+        square = get_square(column, line)
+        if self.is_empty(column, line):
+            return None
+        return self.__create_piece(square)
+
+    def is_empty(self, column, line):
+        bit = 1 << get_square(column, line)
+        return not (self.__occupancy[0] | self.__occupancy[1]) & bit
+
+    def add(self, piece):
+        column, line = piece.position
+        if not self.is_empty(column, line):
+            raise IndexError("There is already an object in this position")
+        bit = 1 << get_square(column, line)
+        self.__pieces[piece.code] |= bit
+        self.__occupancy[piece.color_code] |= bit
+        if piece.moved:
+            self.__moved |= bit
+
+    def get_all_where(self, color):
+        color_index = colors.index(color)
+        return [self.__create_piece(square)
+                for square in iterate_squares(self.__occupancy[color_index])]
+
+    def get_all(self, piece_type, color=None):
+        pieces = []
+        type_index = piece_types.index(piece_type)
+        for color_index in range(2):
+            if color is not None and colors[color_index] != color:
+                continue
+            bitboard = self.__pieces[color_index * 6 + type_index]
+            pieces += [self.__create_piece(square) for square in iterate_squares(bitboard)]
+        return pieces
+
+    def get_all_pieces(self):
+        return [piece for piece in self]
+
+    def count(self, piece_type, color):
+        """Return how many pieces of a type and color are on the board"""
+        return self.get_bitboard(piece_type, color).bit_count()
+
+    def move(self, piece, destination):
+        if piece.position == destination:
+            raise ValueError("destination can't be the current piece position")
+        piece_column, piece_line = piece.position
+        self.remove(piece_column, piece_line)
+        piece.position = destination
+        piece.moved = True
+        self.add(piece)
+
+    @dispatch(int, int)
+    def remove(self, column, line):
+        bit = 1 << get_square(column, line)
+        mask = board_mask ^ bit
+        for index in range(12):
+            self.__pieces[index] &= mask
+        self.__occupancy[0] &= mask
+        self.__occupancy[1] &= mask
+        self.__moved &= mask
+
+    @dispatch(object)
+    def remove(self, piece):
+        column, line = piece.position
+        if self.is_empty(column, line):
+            raise ValueError("piece not in board")
+        self.remove(column, line)
+
+    def is_attacked(self, column, line, color):
+        """
+        Return True if the square is attacked by any piece of the given color
+
+        Args:
+            column (int): column of the square
+            line (int): line of the square
+            color (str): color of the attacking pieces
+        """
+        square = get_square(column, line)
+        color_index = colors.index(color)
+        pieces = self.__pieces[color_index * 6:color_index * 6 + 6]
+        pawns, knights, bishops, rooks, queens, kings = pieces
+        # A square is attacked by a pawn of a color if a pawn of the other color on that
+        # square would attack the pawn
+        if pawn_attacks[1 - color_index][square] & pawns:
+            return True
+        if knight_attacks[square] & knights or king_attacks[square] & kings:
+            return True
+        occupancy = self.occupancy
+        if get_sliding_attacks(square, Rook.directions, occupancy) & (rooks | queens):
+            return True
+        if get_sliding_attacks(square, Bishop.directions, occupancy) & (bishops | queens):
+            return True
+        return False
+
+    def get_attacks(self, column, line):
+        """
+        Return the bitboard of the squares attacked by the piece on the given square
+
+        Args:
+            column (int): column of the piece
+            line (int): line of the piece
+        """
+        square = get_square(column, line)
+        bit = 1 << square
+        for index in range(12):
+            if self.__pieces[index] & bit:
+                break
+        else:
+            return 0
+        color_index, type_index = divmod(index, 6)
+        piece_type = piece_types[type_index]
+        if piece_type == "pawn":
+            return pawn_attacks[color_index][square]
+        if piece_type == "knight":
+            return knight_attacks[square]
+        if piece_type == "king":
+            return king_attacks[square]
+        directions = piece_classes[type_index].directions
+        return get_sliding_attacks(square, directions, self.occupancy)
+
+    def get_possible_moves(self, column, line):
+        """
+        Return the moves of the piece on the given square, without testing if they let the
+        king in check. Castling and en passant aren't included.
+
+        Args:
+            column (int): column of the piece
+            line (int): line of the piece
+
+        Returns:
+            a bitboard with the squares that the piece can move to
+        """
+        square = get_square(column, line)
+        bit = 1 << square
+        color_index = 0 if self.__occupancy[0] & bit else 1
+        enemies = self.__occupancy[1 - color_index]
+        if not self.__pieces[color_index * 6] & bit:
+            return self.get_attacks(column, line) & ~self.__occupancy[color_index]
+        # Pawns
+        empty = board_mask ^ self.occupancy
+        initial_line = 6 if color_index == 0 else 1
+        step = -8 if color_index == 0 else 8
+        moves = 0
+        push = square + step
+        if 0 <= push < 64 and empty & (1 << push):
+            moves |= 1 << push
+            double_push = push + step
+            if line == initial_line and empty & (1 << double_push):
+                moves |= 1 << double_push
+        return moves | pawn_attacks[color_index][square] & enemies
+
+    def generate_moves(self, color):
+        """
+        Generate the moves of all pieces of a color, without testing if they let the king in
+        check. Castling and en passant aren't included.
+
+        Args:
+            color (str): color of the pieces
+
+        Yields:
+            tuples with the origin and destination squares, for example ((1, 7), (2, 5))
+        """
+        for origin in iterate_squares(self.__occupancy[colors.index(color)]):
+            column, line = get_position(origin)
+            for destination in iterate_squares(self.get_possible_moves(column, line)):
+                yield (column, line), get_position(destination)
+
+    def __create_piece(self, square):
+        bit = 1 << square
+        for index in range(12):
+            if self.__pieces[index] & bit:
+                break
+        color_index, type_index = divmod(index, 6)
+        piece = piece_classes[type_index](colors[color_index], get_position(square))
+        piece.moved = bool(self.__moved & bit)
+        return piece
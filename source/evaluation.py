@@ -0,0 +1,86 @@
+# Value of each piece in centipawns. The king can't be captured, so it doesn't count
+piece_values = {"pawn": 100, "knight": 320, "bishop": 330, "rook": 500, "queen": 900, "king": 0}
+
+# Bonus of each piece in each square, indexed by line and then by column from the white
+# player point of view. The black player uses the tables upside down
+piece_square_tables = {
+    "pawn": [[0, 0, 0, 0, 0, 0, 0, 0],
+             [50, 50, 50, 50, 50, 50, 50, 50],
+             [10, 10, 20, 30, 30, 20, 10, 10],
+             [5, 5, 10, 25, 25, 10, 5, 5],
+             [0, 0, 0, 20, 20, 0, 0, 0],
+             [5, -5, -10, 0, 0, -10, -5, 5],
+             [5, 10, 10, -20, -20, 10, 10, 5],
+             [0, 0, 0, 0, 0, 0, 0, 0]],
+    "knight": [[-50, -40, -30, -30, -30, -30, -40, -50],
+               [-40, -20, 0, 0, 0, 0, -20, -40],
+               [-30, 0, 10, 15, 15, 10, 0, -30],
+               [-30, 5, 15, 20, 20, 15, 5, -30],
+               [-30, 0, 15, 20, 20, 15, 0, -30],
+               [-30, 5, 10, 15, 15, 10, 5, -30],
+               [-40, -20, 0, 5, 5, 0, -20, -40],
+               [-50, -40, -30, -30, -30, -30, -40, -50]],
+    "bishop": [[-20, -10, -10, -10, -10, -10, -10, -20],
+               [-10, 0, 0, 0, 0, 0, 0, -10],
+               [-10, 0, 5, 10, 10, 5, 0, -10],
+               [-10, 5, 5, 10, 10, 5, 5, -10],
+               [-10, 0, 10, 10, 10, 10, 0, -10],
+               [-10, 10, 10, 10, 10, 10, 10, -10],
+               [-10, 5, 0, 0, 0, 0, 5, -10],
+               [-20, -10, -10, -10, -10, -10, -10, -20]],
+    "rook": [[0, 0, 0, 0, 0, 0, 0, 0],
+             [5, 10, 10, 10, 10, 10, 10, 5],
+             [-5, 0, 0, 0, 0, 0, 0, -5],
+             [-5, 0, 0, 0, 0, 0, 0, -5],
+             [-5, 0, 0, 0, 0, 0, 0, -5],
+             [-5, 0, 0, 0, 0, 0, 0, -5],
+             [-5, 0, 0, 0, 0, 0, 0, -5],
+             [0, 0, 0, 5, 5, 0, 0, 0]],
+    "queen": [[-20, -10, -10, -5, -5, -10, -10, -20],
+              [-10, 0, 0, 0, 0, 0, 0, -10],
+              [-10, 0, 5, 5, 5, 5, 0, -10],
+              [-5, 0, 5, 5, 5, 5, 0, -5],
+              [0, 0, 5, 5, 5, 5, 0, -5],
+              [-10, 5, 5, 5, 5, 5, 0, -10],
+              [-10, 0, 5, 0, 0, 0, 0, -10],
+              [-20, -10, -10, -5, -5, -10, -10, -20]],
+    "king": [[-30, -40, -40, -50, -50, -40, -40, -30],
+             [-30, -40, -40, -50, -50, -40, -40, -30],
+             [-30, -40, -40, -50, -50, -40, -40, -30],
+             [-30, -40, -40, -50, -50, -40, -40, -30],
+             [-20, -30, -30, -40, -40, -30, -30, -20],
+             [-10, -20, -20, -20, -20, -20, -20, -10],
+             [20, 20, 0, 0, 0, 0, 20, 20],
+             [20, 30, 10, 0, 0, 10, 30, 20]],
+}
+
+
+def get_piece_score(piece):
+    """
+    Return the value of a piece plus the bonus of its square
+
+    Args:
+        piece (pieces.Piece)
+    """
+    column, line = piece.position
+    if piece.color == "black":
+        line = 7 - line
+    return piece_values[piece.type] + piece_square_tables[piece.type][line][column]
+
+
+def evaluate(board, color):
+    """
+    Return the score of a position in centipawns from the point of view of a player. Positive
+    scores are good for that player
+
+    Args:
+        board (game.Board): board of the position
+        color (str): color of the player
+    """
+    enemy_color = "black" if color == "white" else "white"
+    score = 0
+    for piece in board.get_all_where(color):
+        score += get_piece_score(piece)
+    for piece in board.get_all_where(enemy_color):
+        score -= get_piece_score(piece)
+    return score
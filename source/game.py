@@ -1,6 +1,14 @@
 from multipledispatch import dispatch
 
 from source import Pawn, Knight, Rook, Bishop, Queen, King
+from source import zobrist
+from source.pieces import colors, piece_types
+from source.moves import capture_flag, en_passant_flag, castling_flag, double_push_flag
+from source.moves import move_mask, promotion_mask, promotion_codes, positions, get_promotion
+from source.moves import encode
+
+# Symbol of each piece code in the Forsyth-Edwards Notation
+fen_symbols = "PNBRQKpnbrqk"
 
 
 class TurnError(Exception):
@@ -24,10 +32,22 @@ class Game:
         captured_pieces (Dict[str, List[piece.Piece]]): pieces that was captured sorted by color
         turn (str): player that makes the next move
         en_passant_pawn (piece.Piece): pawn that can suffer en passant on the next turn
-        history (List[str]): stores board states that are relevant to check whether threefold
-            repetition occurred or not
+        history (Dict[int, int]): counts how many times each position occurred since the
+            last move that can't be repeated, keyed by the position zobrist key. It's used to
+            check whether threefold repetition occurred or not
         fifty_moves_counter (int): count how much moves occurred without a pawn movement or a
             capture
+        played_moves (List[game.MoveRecord]): records of the moves played, used to take them
+            back
+        fullmove_number (int): number of the current move, incremented after each black move
+        initial_fen (str): position before the first move played, in Forsyth-Edwards Notation
+        initial_captured_pieces (Dict[str, List[str]]): pieces captured before the first move
+            played
+        legal_moves (Dict[pieces.Piece, List[Tuple[int, int]]]): valid moves of the turn
+            player pieces in the current position, None until they're generated. Kept until
+            the position changes, so the highlights, the move validation and the game status
+            share them
+        move_list (List[int]): the same moves encoded as integers, None until they're needed
     """
     def __init__(self):
         self.__board = Board()
@@ -35,8 +55,14 @@ class Game:
         self.__captured_pieces = {"white": [], "black": []}
         self.__turn = "white"
         self.__en_passant_pawn = 0
-        self.__history = []
+        self.__history = {}
         self.__fifty_moves_counter = 0
+        self.__played_moves = []
+        self.__fullmove_number = 1
+        self.__initial_fen = None
+        self.__initial_captured_pieces = {"white": [], "black": []}
+        self.__legal_moves = None
+        self.__move_list = None
 
     @property
     def board(self):
@@ -54,6 +80,55 @@ class Game:
     def turn(self):
         return self.__turn
 
+    @property
+    def status(self):
+        """
+        0 if the game didn't end, otherwise, a number between 1 and 5 depending on how the
+        game ended: 1 is a checkmate, 2 a stalemate, 3 a threefold repetition, 4 the fifty
+        moves rule and 5 insufficient material
+        """
+        return self.__get_game_status()
+
+    @property
+    def initial_fen(self):
+        return self.__initial_fen
+
+    @property
+    def initial_captured_pieces(self):
+        return self.__initial_captured_pieces
+
+    @property
+    def history(self):
+        """
+        Copy of the number of times each position occurred since the last move that can't
+        be repeated, keyed by the position zobrist key
+        """
+        return dict(self.__history)
+
+    @property
+    def zobrist_key(self):
+        """
+        64 bits key of the current position. It's the key of the pieces placement kept by the
+        board, combined with the keys of the turn player, the castling rights and the pawn that
+        can suffer en passant
+        """
+        key = self.__board.zobrist_key
+        if self.__turn == "black":
+            key ^= zobrist.turn_key
+        for castling_right in self.__get_castling_rights():
+            key ^= zobrist.castling_keys[castling_right]
+        if self.__en_passant_pawn != 0:
+            column, line = self.__en_passant_pawn.position
+            # The en passant only changes the position if an enemy pawn is able to make it
+            for adjacent_column in (column - 1, column + 1):
+                if not 0 <= adjacent_column <= 7:
+                    continue
+                piece = self.__board.get(adjacent_column, line)
+                if piece is not None and piece.type == "pawn" and piece.color == self.__turn:
+                    key ^= zobrist.en_passant_keys[column]
+                    break
+        return key
+
     def init_new_game_board(self):
         """Initialize a board with all pieces in their initial positions"""
         piece_classes = [Pawn, Knight, Rook, Bishop, Queen, King]
@@ -62,6 +137,8 @@ class Game:
                 for position in piece_class.initial_positions[color]:
                     piece = piece_class(color, position)
                     self.__board.add(piece)
+        self.__clear_legal_moves()
+        self.__set_initial_position()
 
     def load_saved_game_board(self, game_state):
         """
@@ -82,7 +159,7 @@ class Game:
             piece_info = piece_data.split()
             color, piece_type = piece_info[:2]
             position = int(piece_info[2]), int(piece_info[3])
-            moved = eval(piece_info[-1])
+            moved = piece_info[-1] == "True"
             piece_class = piece_classes[piece_type]
             piece = piece_class(color, position)
             piece.moved = moved
@@ -99,6 +176,102 @@ class Game:
             if self.__is_in_check(king):
                 king.in_check = True
                 break
+        self.__clear_legal_moves()
+        self.__set_initial_position()
+
+    @classmethod
+    def from_fen(cls, fen, captured_pieces=None, history=None):
+        """
+        Create a game from a position in Forsyth-Edwards Notation, for example:
+
+            "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+
+        Args:
+            fen (str): position in Forsyth-Edwards Notation
+            captured_pieces (Dict[str, List[str]]): pieces captured before the position,
+                sorted by color. Defaults to None (no piece was captured)
+            history (Dict[int, int]): repetitions of the positions played before, as returned
+                by Game.history, so a threefold repetition is detected without the moves.
+                Defaults to None (no position was repeated)
+        """
+        fields = fen.split()
+        placement, turn, castling, en_passant = fields[:4]
+        game = cls()
+        game.__turn = "white" if turn == "w" else "black"
+        game.__board = Board.from_fen(placement)
+        # Kings and rooks that can still castle didn't move
+        castling_symbols = {"K": ("white", 7), "Q": ("white", 0),
+                            "k": ("black", 7), "q": ("black", 0)}
+        for symbol in castling.replace("-", ""):
+            color, rook_column = castling_symbols[symbol]
+            line = 7 if color == "white" else 0
+            for column in (4, rook_column):
+                piece = game.__board.get(column, line)
+                if piece is not None:
+                    piece.moved = False
+        if en_passant != "-":
+            # The en passant square is the one the pawn passed through, the pawn is one line
+            # past it, towards the side of the player that is going to move
+            column, line = ord(en_passant[0]) - ord("a"), 8 - int(en_passant[1])
+            line -= 1 if game.__turn == "black" else -1
+            game.__en_passant_pawn = game.__board.get(column, line)
+        if len(fields) > 4:
+            game.__fifty_moves_counter = int(fields[4]) / 2
+        if len(fields) > 5:
+            game.__fullmove_number = int(fields[5])
+        for king in game.__board.get_all("king"):
+            king.in_check = game.__is_in_check(king)
+        if captured_pieces is not None:
+            game.__captured_pieces = {color: list(captured_pieces[color]) for color in colors}
+        if history is not None:
+            game.__history = dict(history)
+        game.__clear_legal_moves()
+        game.__set_initial_position()
+        return game
+
+    def __set_initial_position(self):
+        """Keep the position that the game starts from, so its moves can be saved"""
+        self.__initial_fen = self.to_fen()
+        self.__initial_captured_pieces = {color: list(self.__captured_pieces[color])
+                                          for color in colors}
+
+    def get_played_moves(self):
+        """
+        Returns the moves played since the initial position, encoded as integers without
+        flags (see moves.py)
+        """
+        played_moves = []
+        for record in self.__played_moves:
+            promotion = None
+            if record.promoted_piece is not None:
+                promotion = record.promoted_piece.type
+            played_moves.append(encode(record.origin, record.destination, promotion))
+        return played_moves
+
+    def to_fen(self):
+        """
+        Return the current position in Forsyth-Edwards Notation, for example:
+
+            "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+
+        The castling rights come from the kings and rooks that didn't move, no move is
+        generated
+        """
+        turn = "w" if self.__turn == "white" else "b"
+        castling_symbols = {("white", 7): "K", ("white", 0): "Q",
+                            ("black", 7): "k", ("black", 0): "q"}
+        castling = "".join(sorted((castling_symbols[castling_right]
+                                   for castling_right in self.__get_castling_rights()),
+                                  key="KQkq".index))
+        en_passant = "-"
+        if self.__en_passant_pawn != 0:
+            # The en passant square is the one the pawn passed through
+            column, line = self.__en_passant_pawn.position
+            line -= self.__en_passant_pawn.direction
+            en_passant = f"{'abcdefgh'[column]}{8 - line}"
+        halfmove_clock = int(self.__fifty_moves_counter * 2)
+        return (f"{self.__board.to_fen()} {turn} {castling or '-'} {en_passant} "
+                f"{halfmove_clock} {self.__fullmove_number}")
 
     def select_piece(self, column, line):
         """
@@ -123,35 +296,145 @@ class Game:
         Returns a list of int tuples of 2 elements. The first element is the column, the second is
         the line of the square that the piece can move to
         """
-        return self.__get_valid_moves(self.__selected_piece)
+        if self.__selected_piece is None:
+            return []
+        return list(self.__get_legal_moves([self.__selected_piece])[self.__selected_piece])
 
-    def __get_valid_moves(self, piece):
+    def __get_legal_moves(self, pieces=None):
         """
-        Get all the valid moves that a given piece can make
+        Get the valid moves of the pieces of the turn player. The moves of all the pieces are
+        generated once for each position, the next calls read them from self.__legal_moves
+        until a move is made or taken back. The lists returned must not be changed
 
         Args:
-            piece (piece.Piece)
+            pieces (List[pieces.Piece]): pieces of the turn player whose moves are returned.
+                Defaults to None (all of them)
+
+        Returns:
+            dict that maps each piece to a list of the squares it can move to. For example:
+
+            {<pieces.Knight>: [(0, 5), (2, 5)], <pieces.King>: [], ...}
+        """
+        if self.__legal_moves is None:
+            self.__legal_moves = self.__generate_legal_moves()
+        if pieces is None:
+            return self.__legal_moves
+        return {piece: self.__legal_moves.get(piece, []) for piece in pieces}
+
+    def __clear_legal_moves(self):
+        """Discard the moves generated for the previous position"""
+        self.__legal_moves = None
+        self.__move_list = None
+
+    def __generate_legal_moves(self):
+        """
+        Generate the valid moves of all the pieces of the turn player
+
+        Checks and pins are found once for the position, so each piece only keeps the moves
+        that get the king out of check and stay on its pin line, without testing them one by one
 
         Returns:
-            list of int tuples of 2 elements. The first element is the column, the second is the
-            line of the square that the piece can move to. For example:
-
-            [(1, 1), (1, 2), (2, 1)]
-        """
-        # Remove moves that would let king in check from get_possible_moves
-        # and add castling or en passant if is necessary
-        piece_possible_moves = piece.get_possible_moves(self.__board)
-        piece_valid_moves = []
-        for move in piece_possible_moves:
-            if not self.__let_king_vulnerable(piece, move):
-                piece_valid_moves.append(move)
-        en_passant = self.__get_en_passant(piece)
-        castling = self.__get_castling(piece)
-        if en_passant:
-            piece_valid_moves.append(en_passant)
+            dict that maps each piece to a list of the squares it can move to
+        """
+        board = self.__board
+        king = board.get_all("king", color=self.__turn)[0]
+        checkers, pins = self.__get_checkers_and_pins(king)
+        pieces = board.get_all_where(color=self.__turn)
+        legal_moves = {}
+        for piece in pieces:
+            if piece is king:
+                legal_moves[piece] = self.__get_king_moves(king, in_check=len(checkers) > 0)
+                continue
+            if len(checkers) > 1:
+                # In a double check only the king can move
+                legal_moves[piece] = []
+                continue
+            moves = piece.get_possible_moves(board)
+            if checkers:
+                # Capture the checking piece or block its path to the king
+                evasion_squares = checkers[0]
+                moves = [move for move in moves if move in evasion_squares]
+            if piece in pins:
+                pin_line = pins[piece]
+                moves = [move for move in moves if move in pin_line]
+            en_passant = self.__get_en_passant(piece)
+            if en_passant:
+                moves.append(en_passant)
+            legal_moves[piece] = moves
+        return legal_moves
+
+    def __get_checkers_and_pins(self, king):
+        """
+        Find the pieces that give check to the king and the pieces pinned to it
+
+        Args:
+            king (pieces.King)
+
+        Returns:
+            a tuple with two elements. The first is a list with a set of squares for each
+            piece giving check, the squares that would stop that check by capturing or blocking
+            it. The second is a dict that maps each pinned piece to the set of squares it can
+            move to without leaving the king in check
+        """
+        board = self.__board
+        enemy_color = "black" if king.color == "white" else "white"
+        column, line = king.position
+        checkers = []
+        pins = {}
+        for knight_column, knight_line in Knight.targets[column][line]:
+            piece = board.get(knight_column, knight_line)
+            if piece is not None and piece.color == enemy_color and piece.type == "knight":
+                checkers.append({piece.position})
+        # An enemy pawn attacks the king from the squares where the king would capture if it
+        # were a pawn
+        for pawn_column, pawn_line in Pawn.captures[king.color][column][line]:
+            piece = board.get(pawn_column, pawn_line)
+            if piece is not None and piece.color == enemy_color and piece.type == "pawn":
+                checkers.append({piece.position})
+        for attacker_types, rays in ((("rook", "queen"), Rook.rays),
+                                     (("bishop", "queen"), Bishop.rays)):
+            for ray_squares in rays[column][line]:
+                ray = set()
+                ally = None
+                for square in ray_squares:
+                    ray.add(square)
+                    piece = board.get(*square)
+                    if piece is None:
+                        continue
+                    if piece.color == king.color:
+                        if ally is not None:
+                            # Two allies between the king and the attacker, no pin
+                            break
+                        ally = piece
+                        continue
+                    if piece.type in attacker_types:
+                        if ally is None:
+                            checkers.append(ray)
+                        else:
+                            pins[ally] = ray
+                    break
+        return checkers, pins
+
+    def __get_king_moves(self, king, in_check):
+        """
+        Get the valid moves of the king, including castling
+
+        Args:
+            king (pieces.King)
+            in_check (bool): whether the king is in check
+        """
+        board = self.__board
+        enemy_color = "black" if king.color == "white" else "white"
+        # Take the king off the board so the squares behind it on an attacker ray count as
+        # attacked
+        board.remove(king)
+        attacked_squares = board.get_attacked_squares(enemy_color)
+        board.add(king)
+        moves = [move for move in king.get_possible_moves(board) if move not in attacked_squares]
+        castling = self.__get_castling(king) if not in_check else False
         if castling:
-            piece_valid_moves += castling
-        return piece_valid_moves
+            moves += castling
+        return moves
 
     def __get_en_passant(self, piece):
         """
@@ -188,26 +471,28 @@ class Game:
         """
         if piece.type != "king" or piece.moved:
             return False
-        if piece.in_check:
-            return False
         king = piece
         castling_moves = []
         column, line = piece.position
+        enemy_color = "black" if king.color == "white" else "white"
         for delta in (1, -1):
             current_column = column
             while True:
                 current_column += delta
                 if current_column == 0 or current_column == 7:
                     castling_column = column + 2 * delta
-                    castling_steps = (castling_column - 1 * delta, line), (castling_column, line)
-                    # Check if the king would pass through an attacked square while castling
-                    if any(self.__let_king_vulnerable(king, step) for step in castling_steps):
-                        break
                     if self.__board.is_empty(current_column, line):
                         break
                     piece = self.__board.get(current_column, line)
                     if piece.color != king.color or piece.type != "rook" or piece.moved:
                         break
+                    castling_steps = ((column, line), (castling_column - 1 * delta, line),
+                                      (castling_column, line))
+                    # Check if the king is in check or would pass through an attacked square
+                    # while castling
+                    attacked_squares = self.__board.get_attacked_squares(enemy_color)
+                    if any(step in attacked_squares for step in castling_steps):
+                        break
                     castling_moves.append((castling_column, line))
                     break
                 # Check if there's any piece before the last/first column
@@ -226,21 +511,13 @@ class Game:
         Returns:
             A boolean value that represents whether the king would be in check after this move
         """
-        # Create a copy of the board to simulate the move and check if the king would be
-        # in check after it
-        from copy import deepcopy
-        board_copy = deepcopy(self.__board)
-        column, line = piece.position
-        piece_copy = board_copy.get(column, line)
-        if piece_copy.type == "pawn" and self.__en_passant_pawn != 0:
-            # If the move is an en passant, remove en passant pawn
-            if move[1] == self.__en_passant_pawn.position[1] + piece_copy.direction:
-                board_copy.remove(self.__en_passant_pawn)
-        move_column, move_line = move
-        board_copy.remove(move_column, move_line)
-        board_copy.move(piece_copy, move)
-        ally_king = board_copy.get_all("king", color=piece_copy.color)[0]
-        return self.__is_in_check(ally_king, board=board_copy)
+        # Make the move on the board, check if the king would be in check after it and then
+        # take the move back
+        record = self.__board.make_move(piece, move, self.__en_passant_pawn)
+        ally_king = self.__board.get_all("king", color=piece.color)[0]
+        vulnerable = self.__is_in_check(ally_king)
+        self.__board.unmake_move(record)
+        return vulnerable
 
     def move_selected_piece(self, destination):
         """
@@ -248,110 +525,290 @@ class Game:
 
         Args:
             destination (Tuple[int, int]): square that the selected piece will move to
+
+        Returns:
+            the game.MoveRecord of the move, with the pieces it moved, captured or promoted,
+            so only they need to be drawn again
         """
-        self.__fifty_moves_counter += 0.5
-        selected_piece_valid_moves = self.__get_valid_moves(self.__selected_piece)
+        selected_piece_valid_moves = self.get_selected_piece_moves()
         if destination not in selected_piece_valid_moves:
             raise InvalidMoveException("This piece can't be moved to this position")
-        dest_column, dest_line = destination
-        if not self.__board.is_empty(dest_column, dest_line):
+        return self.__play_move(self.__selected_piece, destination)
+
+    def legal_moves(self):
+        """
+        Get all the valid moves of the turn player
+
+        Returns:
+            list of moves encoded as integers, with their flags (see moves.py). Use
+            moves.to_tuple to get the origin, destination and promotion type of a move
+        """
+        return list(self.__get_move_list())
+
+    def play(self, move):
+        """
+        Play a move of the turn player without selecting the piece. It's the same as moving
+        the selected piece, promoting it if necessary and calling post_movement_actions, but
+        the game status is only calculated when requested.
+
+        Args:
+            move (int): move encoded as an integer (see moves.py), for example
+                moves.encode((4, 6), (4, 4)). A pawn that reaches the last line needs the
+                promotion type. The flags are optional
+
+        Returns:
+            the game.MoveRecord of the move
+        """
+        piece = self.__board.get(*positions[move & 63])
+        if piece is None:
+            raise ValueError("There's not a piece in this position")
+        if piece.color != self.__turn:
+            raise TurnError("Can't move an opponent piece")
+        move &= move_mask
+        legal_moves = self.__get_move_list([piece])
+        if not any(legal_move & move_mask == move for legal_move in legal_moves):
+            squares = move & ~promotion_mask
+            promotions = [legal_move & promotion_mask for legal_move in legal_moves
+                          if legal_move & move_mask & ~promotion_mask == squares]
+            if not promotions:
+                raise InvalidMoveException("This piece can't be moved to this position")
+            if promotions[0]:
+                raise InvalidMoveException("A pawn must be promoted to a queen, rook, bishop or "
+                                           "knight")
+            raise InvalidMoveException("Only a pawn that reaches the last line can be promoted")
+        self.__selected_piece = None
+        record = self.__play_move(piece, positions[move >> 6 & 63], get_promotion(move))
+        self.__update_position()
+        return record
+
+    def undo(self):
+        """Take back the last move played"""
+        if not self.__played_moves:
+            raise IndexError("There isn't any move to take back")
+        record = self.__played_moves.pop()
+        if record.position_key is not None and self.__history is record.history:
+            # The position after the move was counted, so it's discounted
+            repetitions = self.__history[record.position_key] - 1
+            if repetitions > 0:
+                self.__history[record.position_key] = repetitions
+            else:
+                del self.__history[record.position_key]
+        self.__history = record.history
+        self.__fifty_moves_counter = record.fifty_moves_counter
+        if record.piece.color == "black":
+            self.__fullmove_number -= 1
+        if record.captured_piece is not None:
+            self.__captured_pieces[record.captured_piece.color].pop()
+        self.__selected_piece = None
+        self.__unmake_move(record)
+        self.__update_checks()
+
+    def __play_move(self, piece, destination, promotion=None):
+        """
+        Make a move keeping the game information (captured pieces, fifty moves counter and
+        history) and store its record so it can be taken back
+
+        Args:
+            piece (pieces.Piece): piece that will be moved
+            destination (Tuple[int, int]): square that the piece will move to
+            promotion (str): type of the piece that a pawn is promoted to. Defaults to None
+
+        Returns:
+            the game.MoveRecord of the move
+        """
+        fifty_moves_counter = self.__fifty_moves_counter
+        history = self.__history
+        castling_rights = self.__get_castling_rights()
+        record = self.__make_move(piece, destination, promotion)
+        record.fifty_moves_counter = fifty_moves_counter
+        record.history = history
+        self.__played_moves.append(record)
+        self.__fifty_moves_counter += 0.5
+        if piece.color == "black":
+            self.__fullmove_number += 1
+        captured_piece = record.captured_piece
+        if captured_piece is not None:
             self.__fifty_moves_counter = 0
-            self.__history = []  # After a capture any state before it can't be repeated
-            self.__capture(destination)
-        if self.__selected_piece.type == "pawn":
+            self.__history = {}  # After a capture any state before it can't be repeated
+            self.__captured_pieces[captured_piece.color].append(captured_piece.type)
+        if piece.type == "pawn":
             self.__fifty_moves_counter = 0
-            self.__history = []  # After a pawn move any state before it can't be repeated
-            if self.__en_passant_pawn != 0:
-                self.__en_passant(destination)
-        if self.__selected_piece.type == "king" and not self.__selected_piece.moved:
-            self.__castling(destination)
-        if self.__is_susceptible_to_en_passant(self.__selected_piece, destination):
-            self.__en_passant_pawn = self.__selected_piece
-        else:
-            self.__en_passant_pawn = 0
-        self.__board.move(self.__selected_piece, destination)
-        self.__selected_piece.moved = True
-        self.__turn = "black" if self.__turn == "white" else "white"
+            self.__history = {}  # After a pawn move any state before it can't be repeated
+        if self.__get_castling_rights() != castling_rights:
+            # After a castling right is lost any state before it can't be repeated
+            self.__history = {}
+        return record
 
-    def __capture(self, move_position):
+    def __make_move(self, piece, destination, promotion=None):
         """
-        Remove the piece on the given position and add it to the captured_pieces list
+        Make a move on the board and pass the turn, in a way that it can be taken back with
+        __unmake_move
 
         Args:
-            move_position (Tuple[int, int]): position of the deleted piece
+            piece (pieces.Piece): piece that will be moved
+            destination (Tuple[int, int]): square that the piece will move to
+            promotion (str): type of the piece that a pawn is promoted to. Defaults to None
+
+        Returns:
+            the game.MoveRecord of the move
         """
-        column, line = move_position
-        captured_piece = self.__board.get(column, line)
-        self.__captured_pieces[captured_piece.color].append(captured_piece.type)
-        self.__board.remove(column, line)
+        susceptible_to_en_passant = self.__is_susceptible_to_en_passant(piece, destination)
+        record = self.__board.make_move(piece, destination, self.__en_passant_pawn, promotion)
+        # The moves of the position are kept on the record, they're valid again once the move
+        # is taken back
+        record.legal_moves = self.__legal_moves
+        record.move_list = self.__move_list
+        self.__clear_legal_moves()
+        self.__en_passant_pawn = piece if susceptible_to_en_passant else 0
+        self.__turn = "black" if self.__turn == "white" else "white"
+        return record
 
-    def __en_passant(self, move_position):
+    def __unmake_move(self, record):
         """
-        Check if the movement performed is an en passant. If it is, remove en_passant_pawn and
-        append it to the captured pieces list
+        Take back a move made with __make_move
 
         Args:
-            move_position (Tuple[int, int]): position that selected_piece will move to
+            record (game.MoveRecord): record returned by __make_move
         """
-        pawn_column, pawn_line = self.__selected_piece.position
-        en_passant_pawn = self.__en_passant_pawn
-        en_passant_pawn_column, en_passant_pawn_line = en_passant_pawn.position
-        is_adjacent = abs(pawn_column - en_passant_pawn_column) == 1
-        pawn_direction = self.__selected_piece.direction
-        move_is_above_en_passant_pawn = en_passant_pawn_line + pawn_direction == move_position[1]
-        if pawn_line == en_passant_pawn_line and is_adjacent and move_is_above_en_passant_pawn:
-            self.__captured_pieces[self.__en_passant_pawn.color].append(self.__en_passant_pawn.type)
-            self.__board.remove(self.__en_passant_pawn)
-            self.__en_passant_pawn = 0
+        self.__board.unmake_move(record)
+        self.__legal_moves = record.legal_moves
+        self.__move_list = record.move_list
+        self.__en_passant_pawn = record.en_passant_pawn
+        self.__turn = record.piece.color
 
-    def __castling(self, move_position):
+    def __get_move_list(self, pieces=None):
         """
-        Check if the movement performed is a castle. If it is, move the castle rook to it's
-        correspondent position
+        Get the valid moves of the turn player as a flat list of encoded moves (see moves.py),
+        with one move for each piece a pawn can be promoted to. The flags of each move are set
+        here, while the board is known, so the moves don't need to be inspected again
 
         Args:
-            move_position (Tuple[int, int]): position that selected_piece will move to
+            pieces (List[pieces.Piece]): pieces of the turn player whose moves are returned.
+                Defaults to None (all of them, kept on self.__move_list for the position)
+
+        Returns:
+            list of integers, that must not be changed
+        """
+        if pieces is None and self.__move_list is not None:
+            return self.__move_list
+        board = self.__board
+        move_list = []
+        for piece, destinations in self.__get_legal_moves(pieces).items():
+            column, line = piece.position
+            origin = line * 8 + column
+            piece_type = piece.type
+            for destination_column, destination_line in destinations:
+                move = origin | (destination_line * 8 + destination_column) << 6
+                if board.get(destination_column, destination_line) is not None:
+                    move |= capture_flag
+                if piece_type == "pawn":
+                    if destination_column != column and not move & capture_flag:
+                        move |= capture_flag | en_passant_flag
+                    elif destination_line - line in (2, -2):
+                        move |= double_push_flag
+                    if destination_line in (0, 7):
+                        for promotion_code in promotion_codes:
+                            move_list.append(move | promotion_code)
+                        continue
+                elif piece_type == "king" and destination_column - column in (2, -2):
+                    move |= castling_flag
+                move_list.append(move)
+        if pieces is None:
+            self.__move_list = move_list
+        return move_list
+
+    def __make_encoded_move(self, move):
+        """Same as __make_move, with the move encoded as an integer"""
+        piece = self.__board.get(*positions[move & 63])
+        return self.__make_move(piece, positions[move >> 6 & 63], get_promotion(move))
+
+    def perft(self, depth):
+        """
+        Count the positions reached by all the sequences of valid moves of a given length.
+        Used to check the move generation against known values and to measure its speed
+
+        Args:
+            depth (int): number of moves of each sequence
+
+        Returns:
+            the number of positions (leaf nodes)
+        """
+        if depth == 0:
+            return 1
+        move_list = self.__get_move_list()
+        if depth == 1:
+            return len(move_list)
+        nodes = 0
+        for move in move_list:
+            record = self.__make_encoded_move(move)
+            nodes += self.perft(depth - 1)
+            self.__unmake_move(record)
+        return nodes
+
+    def divide(self, depth):
         """
-        # Do the castling if the distance between the king and the point to move is 2
-        move_delta = self.__selected_piece.position[0] - move_position[0]
-        distance = abs(self.__selected_piece.position[0] - move_position[0])
-        if distance == 2:
-            # Once this move was validated by the __get_valid_moves method we already know
-            # that all conditions have been met
-            castling_rook = self.__find_castling_rook(move_position)
-            direction = move_delta//abs(move_delta)
-            rook_movement = move_position[0] + direction, move_position[1]
-            self.__board.move(castling_rook, rook_movement)
+        Same as perft, but count the positions separately for each move of the turn player
 
-    def post_movement_actions(self):
+        Args:
+            depth (int): number of moves of each sequence
+
+        Returns:
+            dict that maps each encoded move to the number of positions reached after it
+        """
+        nodes = {}
+        for move in self.__get_move_list():
+            record = self.__make_encoded_move(move)
+            nodes[move] = self.perft(depth - 1)
+            self.__unmake_move(record)
+        return nodes
+
+    def post_movement_actions(self, check_status=True):
         """
         Game processes that occurs after the move:
             - Check if any king is in check
             - store the current game board state
             - check if the game ended
 
+        Args:
+            check_status (bool): whether the game status is calculated. Defaults to True.
+                When it's False, 0 is returned and the status can be calculated later, for
+                example by analysis.AnalysisService on another thread
+
         Returns:
             True if the game has ended (in draw or with one player winning), otherwise,
             return False
         """
+        self.__update_position()
+        if not check_status:
+            return 0
+        return self.__get_game_status()
+
+    def __update_position(self):
+        """Update the kings in check and count the current position on the history"""
+        self.__update_checks()
+        position_key = self.zobrist_key
+        self.__history[position_key] = self.__history.get(position_key, 0) + 1
+        if self.__played_moves:
+            self.__played_moves[-1].position_key = position_key
+
+    def __update_checks(self):
+        """Mark the kings that are in check"""
         kings = self.__board.get_all("king")
         for king in kings:
             if self.__is_in_check(king):
                 king.in_check = True
                 continue
             king.in_check = False
-        game_status = self.__get_board_state()
-        self.__history.append(game_status)
-        return self.__get_game_status()
 
     def __get_game_status(self):
         """
         Return 0 if the game didn't end, otherwise, return other number between 1 and 5
         depending on how the game ended
         """
-        if self.__is_checkmate():
+        legal_moves = self.__get_legal_moves()
+        if self.__is_checkmate(legal_moves):
             return 1
-        if self.__is_stalemate():
+        if self.__is_stalemate(legal_moves):
             return 2
         if self.__is_threefold_repetition():
             return 3
@@ -361,37 +818,35 @@ class Game:
             return 5
         return 0
 
-    def __is_checkmate(self):
-        """Return True if any king suffered a check mate"""
-        pieces = self.__board.get_all_where(color=self.__turn)
+    def __is_checkmate(self, legal_moves):
+        """
+        Return True if the turn player king suffered a check mate
+
+        Args:
+            legal_moves (Dict[pieces.Piece, List[Tuple[int, int]]]): valid moves of the turn
+                player pieces
+        """
+        if any(legal_moves.values()):
+            return False
         king = self.__board.get_all("king", color=self.__turn)[0]
-        for piece in pieces:
-            if len(self.__get_valid_moves(piece)) > 0:
-                return False
-        if self.__is_in_check(king):
-            return True
-        return False
+        return self.__is_in_check(king)
 
-    def __is_stalemate(self):
-        """Return True if any king suffered a stealmete"""
-        pieces = self.__board.get_all_where(color=self.__turn)
-        for piece in pieces:
-            if len(self.__get_valid_moves(piece)) > 0:
-                return False
-        return True
+    def __is_stalemate(self, legal_moves):
+        """
+        Return True if the turn player king suffered a stealmete
+
+        Args:
+            legal_moves (Dict[pieces.Piece, List[Tuple[int, int]]]): valid moves of the turn
+                player pieces
+        """
+        if any(legal_moves.values()):
+            return False
+        king = self.__board.get_all("king", color=self.__turn)[0]
+        return not self.__is_in_check(king)
 
     def __is_threefold_repetition(self):
         """Return true if the current board state occurred twice before"""
-        if len(self.__history) < 3:
-            return False
-        actual_status = self.__history[-1]
-        repetitions = 0
-        for game_status in self.__history[:-1]:
-            if game_status == actual_status:
-                repetitions += 1
-            if repetitions == 2:
-                return True
-        return False
+        return self.__history.get(self.zobrist_key, 0) >= 3
 
     def __is_insufficient_material(self):
         """Return True if any player don't have pieces enough to make a checkmate"""
@@ -420,23 +875,24 @@ class Game:
             return True
         return False
 
-    def __find_castling_rook(self, king_destination):
+    def __get_castling_rights(self):
         """
-        Return the rook that will be moved on castle given the king final destination.
+        Return a list with the castles that each player can still make, as tuples with the
+        color of the player and the column of the rook. For example:
 
-        Args:
-            king_destination (Tuple[int, int]): king position after the castle
-
-        Returns:
-            a rook object (pieces.Rook)
+            [("white", 0), ("white", 7), ("black", 7)]
         """
-        column, line = king_destination
-        if column == 2:
-            rook_column = 0
-        if column == 6:
-            rook_column = 7
-        rook = self.__board.get(rook_column, line)
-        return rook
+        castling_rights = []
+        for color, line in (("white", 7), ("black", 0)):
+            king = self.__board.get(4, line)
+            if king is None or king.type != "king" or king.color != color or king.moved:
+                continue
+            for rook_column in (0, 7):
+                rook = self.__board.get(rook_column, line)
+                if rook is None or rook.type != "rook" or rook.color != color or rook.moved:
+                    continue
+                castling_rights.append((color, rook_column))
+        return castling_rights
 
     def __is_susceptible_to_en_passant(self, piece, move):
         """
@@ -456,22 +912,15 @@ class Game:
         distance_travelled = abs(piece_line - move_line)
         return distance_travelled == 2
 
-    def __is_in_check(self, king, board=None):
+    def __is_in_check(self, king):
         """
         Return True the given king is in check.
 
         Args:
             king (pieces.King): king that maybe is in check
-            board (game.Board): board object that contains the king. Defaults to None
         """
-        if board is None:
-            board = self.__board
         enemy_color = "black" if king.color == "white" else "white"
-        enemy_pieces = board.get_all_where(color=enemy_color)
-        for piece in enemy_pieces:
-            if king.position in piece.get_possible_moves(board):
-                return True
-        return False
+        return self.__board.is_attacked(*king.position, enemy_color)
 
     def get_king_in_check(self):
         """
@@ -485,12 +934,18 @@ class Game:
 
     def get_game_data(self):
         """
-        Returns a list with all the information necessary to save the game. And it have
-        the following structure:
+        Returns a list with all the information necessary to save the game, in the text
+        format used before savefile.py. And it have the following structure:
             [all pieces in the board (color, type, column, line, number of valid moves, moved),
             turn player, en passant pawn, captured pieces]
+
+        The number of valid moves isn't read by any loader, so it's always 0 instead of
+        generating the moves of every piece
         """
-        game = self.__get_board_state()
+        game = []
+        for piece in self.__board.get_all_pieces():
+            column, line = piece.position
+            game.append(f"{piece.color} {piece.type} {column} {line} 0 {piece.moved}")
         turn_player = self.__turn
         en_passant = 0
         if self.__en_passant_pawn != 0:
@@ -501,25 +956,35 @@ class Game:
         game.append(self.__captured_pieces)
         return str(game)
 
-    def __get_board_state(self):
-        pieces = self.__board.get_all_pieces()
-        game_status = []
-        for piece in pieces:
-            column, line = piece.position
-            amount_of_moves = len(self.__get_valid_moves(piece))
-            line = f"{piece.color} {piece.type} {column} {line} {amount_of_moves} {piece.moved}"
-            game_status.append(line)
-        return game_status
-
     def promote(self, promoted_piece, new_piece):
         self.__board.remove(promoted_piece)
         self.__board.add(new_piece)
-        self.__history = []
+        self.__clear_legal_moves()
+        self.__history = {}
+        if self.__played_moves and self.__played_moves[-1].piece is promoted_piece:
+            # Taking back the move also takes back the promotion
+            self.__played_moves[-1].promoted_piece = new_piece
 
 
 class Board:
+    """
+    Class that keeps the pieces positions
+
+    Attributes:
+        board (List[List[pieces.Piece]]): 8x8 grid indexed by column and line. Empty squares
+            are None
+        pieces (List[List[pieces.Piece]]): pieces on the board indexed by their code, see
+            pieces.Piece
+        attack_tables (Dict[str, Set[Tuple[int, int]]]): squares attacked by each color. They
+            are built when requested and discarded whenever a piece is added or removed
+        zobrist_key (int): 64 bits key of the pieces placement, updated whenever a piece is
+            added or removed
+    """
     def __init__(self):
         self.__board = [[None for column in range(8)] for line in range(8)]
+        self.__pieces = [[] for code in range(12)]
+        self.__attack_tables = {}
+        self.__zobrist_key = 0
 
     def __iter__(self):
         for line in range(8):
@@ -529,6 +994,10 @@ class Board:
                 piece = self.__board[column][line]
                 yield piece
 
+    @property
+    def zobrist_key(self):
+        return self.__zobrist_key
+
     def get(self, column, line):
         return self.__board[column][line]
 
@@ -540,26 +1009,219 @@ class Board:
         if not self.is_empty(column, line):
             raise IndexError("There is already an object in this position")
         self.__board[column][line] = piece
+        self.__pieces[piece.code].append(piece)
+        self.__attack_tables.clear()
+        self.__zobrist_key ^= zobrist.piece_keys[piece.code][column][line]
+
+    def is_attacked(self, column, line, color):
+        """
+        Return True if the square is attacked by any piece of the given color
+
+        Instead of generating the moves of every piece of that color, look from the square
+        to the positions where an attacker could be
+
+        Args:
+            column (int): column of the square
+            line (int): line of the square
+            color (str): color of the attacking pieces
+        """
+        board = self.__board
+        for attacker_type, targets in (("knight", Knight.targets), ("king", King.targets)):
+            for attacker_column, attacker_line in targets[column][line]:
+                piece = board[attacker_column][attacker_line]
+                if piece is not None and piece.color == color and piece.type == attacker_type:
+                    return True
+        # The pawns that attack the square stand where a pawn of the other color would capture
+        enemy_color = "black" if color == "white" else "white"
+        for pawn_column, pawn_line in Pawn.captures[enemy_color][column][line]:
+            piece = board[pawn_column][pawn_line]
+            if piece is not None and piece.color == color and piece.type == "pawn":
+                return True
+        for attacker_types, rays in ((("rook", "queen"), Rook.rays),
+                                     (("bishop", "queen"), Bishop.rays)):
+            for ray in rays[column][line]:
+                for attacker_column, attacker_line in ray:
+                    piece = board[attacker_column][attacker_line]
+                    if piece is not None:
+                        if piece.color == color and piece.type in attacker_types:
+                            return True
+                        break
+        return False
+
+    def get_attacked_squares(self, color):
+        """
+        Return the set of squares attacked by the pieces of the given color
+
+        The set is kept until the next change on the board, so repeated queries on the same
+        position cost a single lookup.
+
+        Args:
+            color (str): color of the attacking pieces
+        """
+        attacked_squares = self.__attack_tables.get(color)
+        if attacked_squares is None:
+            attacked_squares = set()
+            for piece in self.get_all_where(color):
+                attacked_squares.update(self.__get_attacks(piece))
+            self.__attack_tables[color] = attacked_squares
+        return attacked_squares
+
+    def __get_attacks(self, piece):
+        """
+        Return the squares attacked by a piece, including the ones occupied by its allies
+
+        Args:
+            piece (pieces.Piece)
+        """
+        column, line = piece.position
+        if piece.type == "pawn":
+            return Pawn.captures[piece.color][column][line]
+        if piece.type in ("knight", "king"):
+            return piece.targets[column][line]
+        attacks = []
+        for ray in piece.rays[column][line]:
+            for square in ray:
+                attacks.append(square)
+                if self.__board[square[0]][square[1]] is not None:
+                    break
+        return attacks
 
     def get_all_where(self, color):
         pieces = []
-        for piece in self:
-            if piece.color == color:
-                pieces.append(piece)
+        first_code = colors.index(color) * 6
+        for pieces_of_type in self.__pieces[first_code:first_code + 6]:
+            pieces += pieces_of_type
         return pieces
 
     def get_all(self, piece_type, color=None):
-        pieces = []
-        for piece in self:
-            if color is not None and piece.color != color:
-                continue
-            if piece.type == piece_type:
-                pieces.append(piece)
-        return pieces
+        type_code = piece_types.index(piece_type)
+        if color is not None:
+            return list(self.__pieces[colors.index(color) * 6 + type_code])
+        return self.__pieces[type_code] + self.__pieces[6 + type_code]
 
     def get_all_pieces(self):
         return [piece for piece in self]
 
+    @classmethod
+    def from_fen(cls, placement):
+        """
+        Create a board from the pieces placement field of the Forsyth-Edwards Notation. The
+        pawns out of their initial squares and all the other pieces are marked as moved
+
+        Args:
+            placement (str): first field of a FEN, for example
+                "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR"
+        """
+        piece_classes = {"p": Pawn, "n": Knight, "b": Bishop, "r": Rook, "q": Queen, "k": King}
+        board = cls()
+        # The FEN ranks go from the 8th to the 1st, the 8th rank is the line 0
+        for line, rank in enumerate(placement.split("/")):
+            column = 0
+            for symbol in rank:
+                if symbol.isdigit():
+                    column += int(symbol)
+                    continue
+                color = "white" if symbol.isupper() else "black"
+                piece = piece_classes[symbol.lower()](color, (column, line))
+                piece.moved = True
+                if piece.type == "pawn":
+                    piece.moved = piece.position not in Pawn.initial_positions[color]
+                board.add(piece)
+                column += 1
+        return board
+
+    def to_fen(self):
+        """
+        Return the pieces placement field of the Forsyth-Edwards Notation, for example
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR"
+        """
+        board = self.__board
+        ranks = []
+        for line in range(8):
+            rank = ""
+            empty_squares = 0
+            for column in range(8):
+                piece = board[column][line]
+                if piece is None:
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    rank += str(empty_squares)
+                    empty_squares = 0
+                rank += fen_symbols[piece.code]
+            if empty_squares:
+                rank += str(empty_squares)
+            ranks.append(rank)
+        return "/".join(ranks)
+
+    def make_move(self, piece, destination, en_passant_pawn=0, promotion=None):
+        """
+        Move a piece performing the side effects of the move, like captures, en passant,
+        the castling rook move and promotion, in a way that it can be taken back with
+        unmake_move
+
+        Args:
+            piece (pieces.Piece): piece that will be moved
+            destination (Tuple[int, int]): square that the piece will move to
+            en_passant_pawn (pieces.Piece): pawn that can suffer en passant on this move.
+                Defaults to 0 (there isn't any)
+            promotion (str): type of the piece that a pawn is promoted to. Defaults to None
+                (the move isn't a promotion)
+
+        Returns:
+            a MoveRecord object with everything needed to take back the move
+        """
+        record = MoveRecord(piece, destination, en_passant_pawn)
+        column, line = destination
+        if not self.is_empty(column, line):
+            record.captured_piece = self.get(column, line)
+            self.remove(record.captured_piece)
+        elif piece.type == "pawn" and en_passant_pawn != 0 and column != piece.position[0]:
+            # A pawn can only move diagonally to an empty square on an en passant
+            record.captured_piece = en_passant_pawn
+            self.remove(en_passant_pawn)
+        elif piece.type == "king" and abs(column - piece.position[0]) == 2:
+            rook_column = 0 if column == 2 else 7
+            rook = self.get(rook_column, line)
+            direction = 1 if column == 2 else -1
+            record.castling_rook = rook
+            record.rook_origin = rook.position
+            record.rook_moved = rook.moved
+            self.move(rook, (column + direction, line))
+        self.move(piece, destination)
+        if promotion is not None:
+            promotion_classes = {"queen": Queen, "rook": Rook, "bishop": Bishop, "knight": Knight}
+            promoted_piece = promotion_classes[promotion](piece.color, destination)
+            promoted_piece.moved = True
+            self.remove(piece)
+            self.add(promoted_piece)
+            record.promoted_piece = promoted_piece
+        return record
+
+    def unmake_move(self, record):
+        """
+        Take back a move made with make_move
+
+        Args:
+            record (game.MoveRecord): record returned by make_move
+        """
+        piece = record.piece
+        if record.promoted_piece is not None:
+            self.remove(record.promoted_piece)
+        else:
+            self.remove(piece)
+        piece.position = record.origin
+        piece.moved = record.moved
+        self.add(piece)
+        rook = record.castling_rook
+        if rook is not None:
+            self.remove(rook)
+            rook.position = record.rook_origin
+            rook.moved = record.rook_moved
+            self.add(rook)
+        if record.captured_piece is not None:
+            self.add(record.captured_piece)
+
     def move(self, piece, destination):
         if piece.position == destination:
             raise ValueError("destination can't be the current piece position")
@@ -571,11 +1233,66 @@ class Board:
 
     @dispatch(int, int)
     def remove(self, column, line):
+        piece = self.__board[column][line]
+        if piece is None:
+            return
         self.__board[column][line] = None
+        self.__pieces[piece.code].remove(piece)
+        self.__attack_tables.clear()
+        self.__zobrist_key ^= zobrist.piece_keys[piece.code][column][line]
 
     @dispatch(object)
     def remove(self, piece):
         column, line = piece.position
         if self.is_empty(column, line):
             raise ValueError("piece not in board")
-        self.__board[column][line] = None
+        self.remove(column, line)
+
+
+class MoveRecord:
+    """
+    Information needed to take back a move made with Board.make_move
+
+    Args:
+        piece (pieces.Piece): piece that was moved
+        destination (Tuple[int, int]): square that the piece moved to
+        en_passant_pawn (pieces.Piece): pawn that could suffer en passant before the move
+
+    Attributes:
+        piece (pieces.Piece): piece that was moved
+        origin (Tuple[int, int]): square that the piece moved from
+        destination (Tuple[int, int]): square that the piece moved to
+        moved (bool): whether the piece had moved before this move
+        captured_piece (pieces.Piece): piece captured by the move, including an en passant
+            capture. None if there isn't any
+        castling_rook (pieces.Piece): rook moved on a castle. None if the move isn't a castle
+        rook_origin (Tuple[int, int]): square that the castling rook moved from
+        rook_moved (bool): whether the castling rook had moved before this move
+        en_passant_pawn (pieces.Piece): pawn that could suffer en passant before the move,
+            0 if there wasn't any
+        promoted_piece (pieces.Piece): piece that replaced the pawn on a promotion. None if the
+            move isn't a promotion
+        fifty_moves_counter (int): fifty moves counter of the game before the move, set by Game
+        history (Dict[int, int]): repetition history of the game before the move, set by Game
+        position_key (int): zobrist key of the position after the move if the game counted it
+            on the history, set by Game
+        legal_moves (Dict[pieces.Piece, List[Tuple[int, int]]]): valid moves generated for the
+            position before the move, or None, set by Game
+        move_list (List[int]): the same moves encoded as integers, or None, set by Game
+    """
+    def __init__(self, piece, destination, en_passant_pawn=0):
+        self.piece = piece
+        self.origin = piece.position
+        self.destination = destination
+        self.moved = piece.moved
+        self.captured_piece = None
+        self.castling_rook = None
+        self.rook_origin = None
+        self.rook_moved = False
+        self.en_passant_pawn = en_passant_pawn
+        self.promoted_piece = None
+        self.fifty_moves_counter = 0
+        self.history = None
+        self.position_key = None
+        self.legal_moves = None
+        self.move_list = None
@@ -1,10 +1,15 @@
 from datetime import datetime
 import tkinter as tk
+from tkinter import messagebox
 import os
 
 from source import Queen, Rook, Bishop, Knight
 from source import Game, InvalidMoveException
 from source import realpath
+from source.analysis import AnalysisService, get_status, search_best_move
+from source.library import GameLibrary
+from source.moves import to_tuple
+from source.sprites import get_sprite
 
 
 class GameGui(tk.Frame):
@@ -15,27 +20,38 @@ class GameGui(tk.Frame):
 
     Args:
         master (tkinter.Tk): parent widget
-        loaded_game (List[object]): list of pieces of information about the game
+        loaded_game (game.Game): game loaded from a saved file. Defaults to None (a new game)
+        engine_color (str): color of the pieces moved by the computer. Defaults to None (both
+            players are human)
 
     Attributes:
         width (int): width of the window
         height (int): height of the window
         square_side (int): size of the side of the square
         squares (List[int]): IDs of all squares of the board
-        images (List[tkinter.PhotoImage]): list to keep a reference to all the images used
-            so the garbage collector don't erase them.
+        valid_moves (Set[Tuple[int, int]]): squares that the selected piece can move to
+        piece_items (Dict[pieces.Piece, int]): ID of the canvas image of each piece on the
+            board, so a move only changes the images of the pieces it affects
         paused (bool): true if the game was suspended
+        waiting (bool): true while the analysis thread checks the game status or searches the
+            computer move. The clicks on the board are ignored meanwhile
+        engine_color (str): color of the pieces moved by the computer, None if there isn't any
+        analysis (analysis.AnalysisService): runs the game status checks, the hints and the
+            computer moves without blocking the window
         canvas (tkinter.Canvas): widget that draws the board and the pieces
         game (game.Game): object responsible for validating and executing player actions
         master (tkinter.Tk): parent widget
     """
 
-    def __init__(self, master, loaded_game=None):
+    def __init__(self, master, loaded_game=None, engine_color=None):
         super().__init__(master)
         self.width = self.height = 712
         self.squares = []
-        self.images = []
+        self.valid_moves = set()
+        self.piece_items = {}
         self.paused = False
+        self.waiting = False
+        self.engine_color = engine_color
         self.square_side = self.width//8
         master.geometry(f"{self.width}x{self.height}")
         master.resizable(False, False)
@@ -46,14 +62,19 @@ class GameGui(tk.Frame):
         self.pack(expand=True, fill=tk.BOTH)
         self.canvas = tk.Canvas(self, width=self.width, height=self.height)
         self.canvas.pack()
-        self.game = Game()
-        if loaded_game:
-            self.game.load_saved_game_board(loaded_game)
+        if loaded_game is not None:
+            self.game = loaded_game
         else:
+            self.game = Game()
             self.game.init_new_game_board()
         self.draw_board()
         self.draw_pieces()
         self.master = master
+        self.analysis = AnalysisService(self)
+        self.bind("<Destroy>", lambda event: self.analysis.close())
+        master.bind("<h>", self.show_hint)
+        if self.game.turn == self.engine_color:
+            self.request_engine_move()
 
     def draw_board(self):
         """Draws all the squares that compound the board"""
@@ -75,35 +96,63 @@ class GameGui(tk.Frame):
         """Draw the pieces on their respective positions at self.game.board"""
         pieces = self.game.board.get_all_pieces()
         for piece in pieces:
-            column, line = piece.position
-            margin = 2  # Distance between the square border and the piece image border
-            x, y = column * self.square_side + margin, line * self.square_side + margin
-            image = tk.PhotoImage(file=realpath + '/' + piece.image)
-            self.canvas.create_image(x, y, image=image, anchor=tk.NW, tags="piece")
-            self.images.append(image)
+            self.draw_piece(piece)
         self.canvas.tag_bind("piece", "<Button-1>", self.piece_click_event)
         self.highlight_king_in_check()  # In a loaded game, check if the king is in check
 
+    def draw_piece(self, piece):
+        """
+        Create the image of a piece on its position
+
+        Args:
+            piece (pieces.Piece): piece on the board
+        """
+        image = get_sprite(self, "pieces", piece.color, piece.type)
+        x, y = self.get_piece_coords(piece)
+        item = self.canvas.create_image(x, y, image=image, anchor=tk.NW, tags="piece")
+        self.piece_items[piece] = item
+
+    def get_piece_coords(self, piece):
+        """Return the coordinates of the top left corner of the image of a piece"""
+        column, line = piece.position
+        margin = 2  # Distance between the square border and the piece image border
+        return column * self.square_side + margin, line * self.square_side + margin
+
+    def erase_piece(self, piece):
+        """Delete the image of a piece that left the board"""
+        self.canvas.delete(self.piece_items.pop(piece))
+
+    def update_pieces(self, record):
+        """
+        Change only the images of the pieces affected by a move: the moved piece, the captured
+        piece, the castling rook and the piece a pawn was promoted to
+
+        Args:
+            record (game.MoveRecord): record of the move returned by the game
+        """
+        if record.captured_piece is not None:
+            self.erase_piece(record.captured_piece)
+        for piece in (record.piece, record.castling_rook):
+            if piece is not None:
+                self.canvas.coords(self.piece_items[piece], *self.get_piece_coords(piece))
+        if record.promoted_piece is not None:
+            self.erase_piece(record.piece)
+            self.draw_piece(record.promoted_piece)
+
     def square_click_event(self, event):
         """
         Method trigged when the user clicks on a square
 
-        If there's a circle inside the square, move the selected piece to that square.
+        If the selected piece can move to the square, move it to that square.
         If not, unselect the piece and erase all the moves highlights.
 
         Args:
             event (tkinter.Event): object that contains information about the event
         """
-        if self.paused:
+        if self.paused or self.waiting:
             return
-        x, y = event.x, event.y
-        square_x, square_y = self.find_square(x, y)
-        square_coords = square_x, square_y, square_x + self.square_side, square_y + self.square_side
-        enclosed_objects = self.canvas.find_enclosed(*square_coords)
-        for obj in enclosed_objects:
-            if "move" in self.canvas.gettags(obj):
-                self.move_event(event)
-                break
+        if self.get_square(event.x, event.y) in self.valid_moves:
+            self.move_event(event)
         else:
             self.unselect()
 
@@ -119,11 +168,9 @@ class GameGui(tk.Frame):
         Args:
             event (tkinter.Event): object that contains information about the event
         """
-        if self.paused:
+        if self.paused or self.waiting:
             return
-        x, y = event.x, event.y
-        square_x, square_y = self.find_square(x, y)
-        column, line = int(square_x/self.square_side), int(square_y/self.square_side)
+        column, line = self.get_square(event.x, event.y)
         clicked_piece = self.game.board.get(column, line)
         if clicked_piece.color != self.game.turn:
             if self.game.selected_piece is not None:
@@ -131,7 +178,7 @@ class GameGui(tk.Frame):
             return
         self.unselect()
         self.game.select_piece(column, line)
-        self.highlight_square(square_x, square_y)
+        self.highlight_square(column * self.square_side, line * self.square_side)
 
     def move_event(self, event):
         """
@@ -140,20 +187,16 @@ class GameGui(tk.Frame):
         args:
             event (tkinter.Event): object that contains information about the event
         """
-        if self.paused:
+        if self.paused or self.waiting:
             return
-        x, y = event.x, event.y
-        square_x, square_y = self.find_square(x, y)
-        column, line = int(square_x/self.square_side), int(square_y/self.square_side)
-        move = column, line
+        move = self.get_square(event.x, event.y)
         try:
-            self.game.move_selected_piece(move)
+            record = self.game.move_selected_piece(move)
         except InvalidMoveException:
             self.unselect()
             return
         moved_piece = self.game.selected_piece
-        self.canvas.delete("piece")
-        self.draw_pieces()
+        self.update_pieces(record)
         self.canvas.delete("check")
         self.unselect()
         if self.was_promoted(moved_piece):
@@ -163,11 +206,113 @@ class GameGui(tk.Frame):
             self.finish_move()
 
     def finish_move(self):
-        """Highlight the king if it is in check and check if the game ended."""
-        game_status = self.game.post_movement_actions()
+        """
+        Highlight the king if it is in check and check if the game ended. The status is
+        calculated on the analysis thread, the tasks of the previous position are cancelled
+        """
+        self.game.post_movement_actions(check_status=False)
         self.highlight_king_in_check()
+        self.analysis.cancel()
+        self.canvas.delete("hint")
+        self.waiting = True
+        self.analysis.submit(self.game, get_status, self.status_checked, self.status_failed)
+
+    def status_checked(self, game_status):
+        """
+        Called with the game status calculated after a move. Ends the game or, if it's the
+        computer turn, asks for its move
+
+        args:
+            game_status (int): 0 if the game didn't end, see Game.status
+        """
+        self.waiting = False
         if game_status != 0:
             self.end_game(game_status)
+        elif self.game.turn == self.engine_color:
+            self.request_engine_move()
+
+    def status_failed(self, error):
+        """
+        Called when the analysis thread couldn't calculate the game status. The status is
+        calculated on the Tk thread instead
+
+        args:
+            error (Exception): exception raised on the analysis thread
+        """
+        self.status_checked(self.game.status)
+
+    def request_engine_move(self):
+        """Search the computer move on the analysis thread"""
+        self.waiting = True
+        self.analysis.submit(self.game, search_best_move, self.play_engine_move,
+                             self.engine_move_failed)
+
+    def engine_move_failed(self, error):
+        """
+        Called when the analysis thread couldn't search the computer move. The search isn't
+        repeated on the Tk thread, that would freeze the window, the error is shown instead
+
+        args:
+            error (Exception): exception raised on the analysis thread
+        """
+        self.waiting = False
+        messagebox.showerror("Computer move", f"The computer couldn't find a move: {error}",
+                             parent=self)
+
+    def play_engine_move(self, move):
+        """
+        Play the move found for the computer, in the same way as a move of the user
+
+        args:
+            move (int): move encoded as an integer (see moves.py), None if the search didn't
+                find any
+        """
+        self.waiting = False
+        if move is None or self.paused:
+            return
+        origin, destination, promotion = to_tuple(move)
+        self.unselect()
+        self.game.select_piece(*origin)
+        record = self.game.move_selected_piece(destination)
+        self.update_pieces(record)
+        self.canvas.delete("check")
+        self.unselect()
+        if promotion is None:
+            self.finish_move()
+            return
+        pieces = {"queen": Queen, "rook": Rook, "bishop": Bishop, "knight": Knight}
+        pawn = record.piece
+        self.promote(pawn, pieces[promotion](pawn.color, pawn.position))
+
+    def show_hint(self, event=None):
+        """
+        Search the best move of the turn player on the analysis thread and highlight it. The
+        search is cancelled if a move is made before it ends
+
+        Args:
+            event (tkinter.Event): object that contains information about the event
+        """
+        if self.paused or self.waiting:
+            return
+        self.canvas.delete("hint")
+        self.analysis.submit(self.game, search_best_move, self.highlight_hint)
+
+    def highlight_hint(self, move):
+        """
+        Contour the origin and destination squares of a move suggested by the hint
+
+        args:
+            move (int): move encoded as an integer (see moves.py), None if there isn't any
+        """
+        if move is None:
+            return
+        origin, destination = to_tuple(move)[:2]
+        border = 3
+        for column, line in (origin, destination):
+            x, y = column * self.square_side, line * self.square_side
+            x0, y0 = x + border, y + border
+            x1, y1 = x + self.square_side - border, y + self.square_side - border
+            self.canvas.create_rectangle(x0, y0, x1, y1, outline="#3a86ff", tags="hint", width=5)
 
     def end_game(self, game_status):
         """
@@ -213,25 +358,26 @@ class GameGui(tk.Frame):
             new_piece (piece.Piece): piece that will replace the old piece
         """
         self.game.promote(promoted_piece, new_piece)
-        self.canvas.delete("piece")
-        self.draw_pieces()
+        self.erase_piece(promoted_piece)
+        self.draw_piece(new_piece)
         self.finish_move()
 
-    def find_square(self, x, y):
+    def get_square(self, x, y):
         """
-        Finds on which square is the point (x, y)
+        Finds the column and line of the square where the point (x, y) is, calculated from
+        the size of the squares instead of asking the canvas
 
         args:
             x (int): horizontal position of the point
             y (int): vertical position of the point
 
         returns:
-            coordinate of the left top corner of the square as a tuple, for example: (0, 89)
+            column and line of the square as a tuple, for example: (0, 1)
         """
-        for square in self.squares:
-            x0, y0, x1, y1 = self.canvas.coords(square)
-            if x0 <= x <= x1 and y0 <= y <= y1:
-                return x0, y0
+        # A point on the right or bottom border belongs to the last square
+        column = min(max(int(x), 0) // self.square_side, 7)
+        line = min(max(int(y), 0) // self.square_side, 7)
+        return column, line
 
     def highlight_square(self, x, y):
         """
@@ -253,8 +399,8 @@ class GameGui(tk.Frame):
 
         Creates a circle if the square is empty and contours squares of capturable pieces.
         """
-        valid_moves = self.game.get_selected_piece_moves()
-        for move in valid_moves:
+        self.valid_moves = set(self.game.get_selected_piece_moves())
+        for move in self.valid_moves:
             column, line = move
             x, y = column * self.square_side, line * self.square_side
             x0, y0, x1, y1 = x, y, x + self.square_side, y + self.square_side
@@ -288,6 +434,7 @@ class GameGui(tk.Frame):
         Unselect the selected piece and remove all highlights on squares.
         """
         self.game.unselect()
+        self.valid_moves = set()
         self.canvas.delete("selected")
         self.canvas.delete("move")
 
@@ -334,8 +481,6 @@ class PromotionWindow(tk.Toplevel):
         color (str): color of the promoted pawn
         pawn (piece.Pawn): promoted pawn
         canvas (tkinter.Canvas): the widget that draws the grid and the pieces
-        pieces (List[tkinter.PhotoImage]): List to keep a reference to all the images used,
-            so the garbage collector doesn't erase them.
     """
     def __init__(self, master, pawn):
         self.width = self.height = 178
@@ -345,7 +490,6 @@ class PromotionWindow(tk.Toplevel):
         self.square_side = self.width//2
         self.color = pawn.color
         self.pawn = pawn
-        self.pieces = []
         icon = tk.PhotoImage(file="images/icon.png")
         self.iconphoto(False, icon)
         self.title("Promotion")
@@ -381,20 +525,14 @@ class PromotionWindow(tk.Toplevel):
 
     def draw_pieces(self):
         """Draws one piece in each square for the player to choose"""
-        queen_image = f"images/pieces/{self.color}/queen.png"
-        rook_image = f"images/pieces/{self.color}/rook.png"
-        bishop_image = f"images/pieces/{self.color}/bishop.png"
-        knight_image = f"images/pieces/{self.color}/knight.png"
-        images = {"queen": queen_image, "rook": rook_image,
-                  "bishop": bishop_image, "knight": knight_image}
+        pieces = ["queen", "rook", "bishop", "knight"]
         margin = 2
         c = 0
         for y in range(2):
             for x in range(2):
                 x0, y0 = self.square_side * x + margin, self.square_side * y + margin
-                piece = list(images.keys())[c]
-                image = tk.PhotoImage(file=images[piece])
-                self.pieces.append(image)
+                piece = pieces[c]
+                image = get_sprite(self, "pieces", self.color, piece)
                 self.canvas.create_image(x0, y0, image=image, anchor=tk.NW, tags=f"piece {piece}")
                 c += 1
         self.canvas.tag_bind("piece", "<Button-1>", self.click_event)
@@ -601,12 +739,16 @@ class SaveGameWindow(tk.Toplevel):
 
     def yes_btn_event(self):
         """Saves the game on a file inside the hidden directory and close the game"""
-        game_state = self.master.game.get_game_data()
         filename = self.game_file_entry.get()
         home = os.path.expanduser('~')
-        path = f"{home}/.MasterChess/{filename}"
-        with open(path, 'w') as game_file:
-            game_file.write(game_state)
+        library = GameLibrary(f"{home}/.MasterChess")
+        try:
+            library.save(filename, self.master.game)
+        except ValueError as error:
+            messagebox.showerror("Save Game", str(error), parent=self)
+            return
+        finally:
+            library.close()
         self.master.master.destroy()
 
     def no_btn_event(self):
@@ -0,0 +1,174 @@
+import os
+import sqlite3
+import struct
+
+from source import savefile
+from source.game import fen_symbols
+from source.savefile import GameSummary
+from source.pieces import colors, piece_types
+
+# Errors raised when a file of the directory isn't a saved game that can be read
+read_errors = (OSError, ValueError, SyntaxError, TypeError, KeyError, IndexError, RecursionError,
+               struct.error)
+
+
+class GameLibrary:
+    """
+    Saved games of a directory with an index of their previews
+
+    The index is a SQLite database inside the directory that keeps the summary of each saved
+    game with the modification time of its file. A summary is read from the file again only
+    when the file changed, so browsing the saved games costs one indexed query for each
+    game instead of reading and parsing its file.
+
+    Args:
+        directory (str): directory of the saved games. It's created if it doesn't exist
+
+    Attributes:
+        directory (str): directory of the saved games
+        connection (sqlite3.Connection): connection to the index database
+    """
+    index_name = ".library.db"
+    # Files of the index: the database and the journals that SQLite creates next to it
+    index_suffixes = ("", "-journal", "-wal", "-shm")
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.__directory = directory
+        self.__connection = sqlite3.connect(os.path.join(directory, self.index_name))
+        self.__connection.execute("""
+            CREATE TABLE IF NOT EXISTS games (
+                name TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                turn TEXT NOT NULL,
+                board TEXT NOT NULL,
+                white_captured TEXT NOT NULL,
+                black_captured TEXT NOT NULL
+            )""")
+        self.__connection.commit()
+
+    @property
+    def directory(self):
+        return self.__directory
+
+    def get_names(self):
+        """
+        Return the names of the saved games sorted alphabetically. The index is synchronized
+        with the directory: games of deleted files are removed and changed files are read
+        again. A file that can't be read is still listed, but it isn't indexed, so the error
+        is raised only when its summary is requested
+
+        Returns:
+            list of file names
+        """
+        index_files = {self.index_name + suffix for suffix in self.index_suffixes}
+        names = [name for name in os.listdir(self.__directory) if name not in index_files]
+        indexed = dict(self.__connection.execute("SELECT name, mtime FROM games"))
+        removed = [(name,) for name in indexed if name not in names]
+        self.__connection.executemany("DELETE FROM games WHERE name = ?", removed)
+        for name in names:
+            mtime = os.path.getmtime(self.__get_path(name))
+            if indexed.get(name) != mtime:
+                try:
+                    self.__index_file(name, mtime)
+                except read_errors:
+                    self.__connection.execute("DELETE FROM games WHERE name = ?", (name,))
+        self.__connection.commit()
+        return sorted(names)
+
+    def get_summary(self, name):
+        """
+        Return the preview information of a saved game
+
+        Args:
+            name (str): name of the file
+
+        Returns:
+            a savefile.GameSummary object
+        """
+        mtime = os.path.getmtime(self.__get_path(name))
+        row = self.__connection.execute(
+            "SELECT mtime, turn, board, white_captured, black_captured FROM games "
+            "WHERE name = ?", (name,)).fetchone()
+        if row is None or row[0] != mtime:
+            summary = self.__index_file(name, mtime)
+            self.__connection.commit()
+            return summary
+        return self.__get_summary_from_row(row[1:])
+
+    def load(self, name):
+        """
+        Load a saved game
+
+        Args:
+            name (str): name of the file
+
+        Returns:
+            a game.Game object
+        """
+        return savefile.load_game(self.__get_path(name))
+
+    def save(self, name, game):
+        """
+        Save a game on a file of the directory and add it to the index. Raises ValueError if
+        the name starts with ".", like the files of the index
+
+        Args:
+            name (str): name of the file
+            game (game.Game)
+        """
+        if name.startswith("."):
+            raise ValueError("The name of a saved game can't start with a dot")
+        path = self.__get_path(name)
+        savefile.save_game(game, path)
+        pieces = [(piece.color, piece.type) + piece.position
+                  for piece in game.board.get_all_pieces()]
+        summary = GameSummary(game.turn, pieces, game.captured_pieces)
+        self.__store(name, os.path.getmtime(path), summary)
+        self.__connection.commit()
+
+    def delete(self, name):
+        """
+        Delete a saved game and remove it from the index
+
+        Args:
+            name (str): name of the file
+        """
+        os.remove(self.__get_path(name))
+        self.__connection.execute("DELETE FROM games WHERE name = ?", (name,))
+        self.__connection.commit()
+
+    def close(self):
+        self.__connection.close()
+
+    def __get_path(self, name):
+        return os.path.join(self.__directory, name)
+
+    def __index_file(self, name, mtime):
+        """Read the summary of a file and store it on the index, returning the summary"""
+        summary = savefile.read_summary(self.__get_path(name))
+        self.__store(name, mtime, summary)
+        return summary
+
+    def __store(self, name, mtime, summary):
+        # The board is stored as a string with the FEN symbol of each square, "." if empty
+        board = ["."] * 64
+        for color, piece_type, column, line in summary.pieces:
+            board[line * 8 + column] = fen_symbols[colors.index(color) * 6 +
+                                                     piece_types.index(piece_type)]
+        captured_pieces = summary.captured_pieces
+        self.__connection.execute(
+            "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?)",
+            (name, mtime, summary.turn, "".join(board), " ".join(captured_pieces["white"]),
+             " ".join(captured_pieces["black"])))
+
+    def __get_summary_from_row(self, row):
+        turn, board, white_captured, black_captured = row
+        pieces = []
+        for square, symbol in enumerate(board):
+            if symbol == ".":
+                continue
+            color_code, type_code = divmod(fen_symbols.index(symbol), 6)
+            pieces.append((colors[color_code], piece_types[type_code], square % 8, square // 8))
+        captured_pieces = {"white": white_captured.split(), "black": black_captured.split()}
+        return GameSummary(turn, pieces, captured_pieces)
@@ -3,6 +3,8 @@ import os
 
 from source import MainMenu, GameGui
 from source import realpath
+from source.library import GameLibrary
+from source.sprites import get_sprite
 
 
 class LoadGameWindow(tk.Frame):
@@ -17,6 +19,7 @@ class LoadGameWindow(tk.Frame):
         self.master = master
         home_dir = os.path.expanduser('~')
         self.game_dir = f"{home_dir}/.MasterChess"
+        self.library = GameLibrary(self.game_dir)
         self.listbox_frame = ListboxFrame(self)
         self.pack(expand=True, fill=tk.BOTH)
         self.set_components()
@@ -27,7 +30,7 @@ class LoadGameWindow(tk.Frame):
 
     def set_listbox(self):
         self.listbox_frame.pack(pady=20, padx=5, side=tk.LEFT, anchor=tk.S)
-        game_files = os.listdir(self.game_dir)
+        game_files = self.library.get_names()
         self.listbox_frame.add_elements(game_files)
         self.listbox_frame.set_on_select_event(self.listbox_on_select)
 
@@ -40,39 +43,27 @@ class LoadGameWindow(tk.Frame):
     def listbox_on_select(self, event):
         self.remove_current_preview()
         listbox = event.widget.master
-        self.show_board_preview(listbox)
-        self.show_captured_pieces(listbox)
-        self.set_turn_label(listbox)
-        self.set_buttons()
-
-    def show_board_preview(self, listbox):
         filename = listbox.get_selected_element()
         if filename is None:
             return
-        path = f"{self.game_dir}/{filename}"
-        preview = BoardPreview(self, path)
+        summary = self.library.get_summary(filename)
+        self.show_board_preview(summary)
+        self.show_captured_pieces(summary)
+        self.set_turn_label(summary)
+        self.set_buttons()
+
+    def show_board_preview(self, summary):
+        preview = BoardPreview(self, summary)
         preview.show_preview(x=285, y=175)
 
-    def show_captured_pieces(self, listbox):
-        filename = listbox.get_selected_element()
-        if filename is None:
-            return
-        path = f"{self.game_dir}/{filename}"
-        white_pieces = CapturedPiecesField(self, "white", path)
-        black_pieces = CapturedPiecesField(self, "black", path)
+    def show_captured_pieces(self, summary):
+        white_pieces = CapturedPiecesField(self, "white", summary)
+        black_pieces = CapturedPiecesField(self, "black", summary)
         white_pieces.place(x=285, y=140)
         black_pieces.place(x=285, y=290)
 
-    def set_turn_label(self, listbox):
-        filename = listbox.get_selected_element()
-        if filename is None:
-            return
-        path = f"{self.game_dir}/{filename}"
-        turn = 0
-        with open(path, 'r') as game_file:
-            content = eval(game_file.read())
-            turn = content[-3]
-        text = f"Turn player: {turn}"
+    def set_turn_label(self, summary):
+        text = f"Turn player: {summary.turn}"
         lbl_turn = tk.Label(self, text=text)
         lbl_turn.place(x=270, y=100)
 
@@ -87,8 +78,7 @@ class LoadGameWindow(tk.Frame):
         selected_element = self.listbox_frame.get_selected_element()
         if selected_element is None:
             return
-        path = f"{self.game_dir}/{selected_element}"
-        os.remove(path)
+        self.library.delete(selected_element)
         selected_index = listbox.curselection()[0]
         listbox.delete(selected_index)
         self.remove_current_preview()
@@ -97,11 +87,8 @@ class LoadGameWindow(tk.Frame):
         selected_element = self.listbox_frame.get_selected_element()
         if selected_element is None:
             return
-        path = f"{self.game_dir}/{selected_element}"
-        game = 0
-        with open(path, 'r') as game_file:
-            content = game_file.read()
-            game = eval(content)
+        game = self.library.load(selected_element)
+        self.library.close()
         self.master.destroy()
         new_root = tk.Tk()
         game_gui = GameGui(new_root, loaded_game=game)
@@ -115,6 +102,7 @@ class LoadGameWindow(tk.Frame):
             child.destroy()
 
     def back_to_main_menu(self):
+        self.library.close()
         self.master.destroy()
         new_root = tk.Tk()
         main_menu = MainMenu(new_root)
@@ -122,12 +110,11 @@ class LoadGameWindow(tk.Frame):
 
 
 class BoardPreview(tk.Canvas):
-    def __init__(self, master, file):
+    def __init__(self, master, summary):
         self.width = self.height = 104
         super().__init__(master, width=self.width, height=self.height)
         self.square_size = self.width // 8
-        self.images = []
-        self.file = file
+        self.summary = summary
 
     def show_preview(self, x, y):
         self.draw_board()
@@ -148,30 +135,10 @@ class BoardPreview(tk.Canvas):
             colors.reverse()
 
     def draw_pieces(self):
-        pieces = self.get_pieces()
-        for piece in pieces:
-            color = piece[0]
-            piece_type = piece[1]
-            column, line = piece[2:]
-            image_path = f"{realpath}/images/mini-pieces/{color}/{piece_type}.png"
+        for color, piece_type, column, line in self.summary.pieces:
             x, y = column * self.square_size, line * self.square_size
-            image = tk.PhotoImage(file=image_path)
+            image = get_sprite(self, "mini-pieces", color, piece_type)
             self.create_image(x, y, image=image, anchor=tk.NW)
-            self.images.append(image)
-
-    def get_pieces(self):
-        pieces = []
-        board_state = 0
-        with open(self.file, 'r') as game_file:
-            content = eval(game_file.read())
-            board_state = content[:-4]
-        for piece in board_state:
-            piece_info = piece.split()
-            color = piece_info[0]
-            piece_type = piece_info[1]
-            column, line = int(piece_info[2]), int(piece_info[3])
-            pieces.append([color, piece_type, column, line])
-        return pieces
 
 
 class ListboxFrame(tk.Frame):
@@ -203,10 +170,10 @@ class ListboxFrame(tk.Frame):
 
 
 class CapturedPiecesField(tk.Canvas):
-    def __init__(self, master, color, file):
+    def __init__(self, master, color, summary):
         super().__init__(master, width=104, height=26)
         self.color = color
-        self.path = file
+        self.summary = summary
         self.show_captured_pieces()
 
     def show_captured_pieces(self):
@@ -214,11 +181,7 @@ class CapturedPiecesField(tk.Canvas):
         self.draw_pieces(pieces)
 
     def get_pieces(self):
-        captured_pieces = 0
-        with open(self.path, 'r') as game_file:
-            content = eval(game_file.read())
-            captured_pieces = content[-1]
-        return captured_pieces[self.color]
+        return list(self.summary.captured_pieces[self.color])
 
     def sort_pieces(self, pieces):
         # Each piece have a value according to its type
@@ -240,15 +203,12 @@ class CapturedPiecesField(tk.Canvas):
         return pieces
 
     def draw_pieces(self, pieces):
-        self.images = []
         column = line = 0
         piece_size = 13
         for piece in pieces:
-            img_path = f"{realpath}/images/mini-pieces/{self.color}/{piece}.png"
-            image = tk.PhotoImage(file=img_path)
+            image = get_sprite(self, "mini-pieces", self.color, piece)
             x, y = column * piece_size, line * piece_size
             self.create_image(x, y, image=image, anchor=tk.NW)
-            self.images.append(image)
             if column == 7:
                 column = 0
                 line += 1
@@ -15,6 +15,8 @@ class MainMenu(tk.Frame):
     """
 
     def __init__(self, master):
+        from source import sprites
+        sprites.preload()  # The images of the pieces are read while the menu is open
         super().__init__(master)
         self.width, self.height = 350, 300
         master.geometry(f"{self.width}x{self.height}")
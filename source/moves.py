@@ -0,0 +1,112 @@
+"""
+Integer encoding of the moves
+
+A move is packed in a single int:
+    - bits 0 to 5: origin square, line * 8 + column
+    - bits 6 to 11: destination square
+    - bits 12 to 14: type code of the piece a pawn is promoted to (see pieces.Piece), 0 when
+      the move isn't a promotion
+    - bits 15 to 18: flags with the kind of the move
+
+The origin, destination and promotion identify a move. The flags are filled by the move
+generation of game.Game, so the moves it returns don't need to be inspected on the board.
+"""
+from source.pieces import piece_types
+
+capture_flag = 1 << 15
+en_passant_flag = 1 << 16
+castling_flag = 1 << 17
+double_push_flag = 1 << 18
+
+# Bits of the origin, destination and promotion, the part that identifies a move
+move_mask = (1 << 15) - 1
+promotion_mask = 7 << 12
+
+promotion_types = ("queen", "rook", "bishop", "knight")
+# Promotion bits of each type of promotion_types
+promotion_codes = [piece_types.index(promotion) << 12 for promotion in promotion_types]
+
+# Column and line of each square
+positions = [(square % 8, square // 8) for square in range(64)]
+
+
+def get_square(position):
+    """Return the number of the square of a position, for example (4, 6) is 52"""
+    column, line = position
+    return line * 8 + column
+
+
+def encode(origin, destination, promotion=None, flags=0):
+    """
+    Return the integer of a move
+
+    Args:
+        origin (Tuple[int, int]): column and line of the moved piece
+        destination (Tuple[int, int]): column and line that the piece moves to
+        promotion (str): type of the piece that a pawn is promoted to. Defaults to None
+        flags (int): flags of the move. Defaults to 0
+    """
+    move = get_square(origin) | get_square(destination) << 6 | flags
+    if promotion is not None:
+        move |= piece_types.index(promotion) << 12
+    return move
+
+
+def get_origin(move):
+    return positions[move & 63]
+
+
+def get_destination(move):
+    return positions[move >> 6 & 63]
+
+
+def get_promotion(move):
+    """Return the type of the piece that a pawn is promoted to, or None"""
+    type_code = move >> 12 & 7
+    return piece_types[type_code] if type_code else None
+
+
+def is_capture(move):
+    """Return True if the move captures a piece, including en passant"""
+    return move & capture_flag != 0
+
+
+def to_tuple(move):
+    """
+    Return a move as coordinate tuples, for example ((4, 6), (4, 4), None)
+
+    Returns:
+        a tuple with the origin, the destination and the promotion type
+    """
+    return positions[move & 63], positions[move >> 6 & 63], get_promotion(move)
+
+
+def from_tuple(move):
+    """
+    Return the integer of a move given as coordinate tuples, without flags
+
+    Args:
+        move (Tuple): origin and destination, optionally followed by the promotion type, for
+            example ((4, 6), (4, 4)) or ((0, 1), (0, 0), "queen")
+    """
+    return encode(*move)
+
+
+def get_square_name(position):
+    """Return the name of the square in a position, for example (4, 6) is "e2" """
+    column, line = position
+    return f"{'abcdefgh'[column]}{8 - line}"
+
+
+def get_move_name(move):
+    """
+    Return a move in coordinate notation, for example "e2e4" or "a7a8q"
+
+    Args:
+        move (int): encoded move
+    """
+    origin, destination, promotion = to_tuple(move)
+    name = get_square_name(origin) + get_square_name(destination)
+    if promotion is not None:
+        name += "n" if promotion == "knight" else promotion[0]
+    return name
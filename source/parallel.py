@@ -0,0 +1,137 @@
+from multiprocessing import Pool, cpu_count
+from time import perf_counter
+
+from source.game import Game
+from source.search import Search, SearchResult, max_ply
+from source.transposition import TranspositionTable
+
+
+def search_root_moves(arguments):
+    """
+    Search a part of the moves of a position. Runs inside a worker process of ParallelSearch
+
+    Args:
+        arguments (Tuple): FEN of the position, moves to be searched, maximum depth, time
+            limit, node limit and size of the transposition table in megabytes
+
+    Returns:
+        a tuple (best_move, iterations, nodes), see SearchResult. The best move is the first
+        ordered move if no iteration was completed
+    """
+    fen, root_moves, max_depth, time_limit, node_limit, table_size = arguments
+    game = Game.from_fen(fen)
+    search = Search(game, max_depth, time_limit, node_limit, TranspositionTable(table_size),
+                    root_moves)
+    result = search.run()
+    return result.best_move, result.iterations, result.nodes
+
+
+def merge_results(worker_results):
+    """
+    Merge the results of the workers of a ParallelSearch
+
+    The scores of different depths can't be compared, so the best move is taken from the
+    iterations of the lowest depth that every worker completed. A worker that didn't complete
+    any iteration only returns an unsearched move and is left out.
+
+    Args:
+        worker_results (List[Tuple]): results returned by search_root_moves
+
+    Returns:
+        a SearchResult object, with the nodes of all the workers
+    """
+    result = SearchResult()
+    result.nodes = sum(nodes for best_move, iterations, nodes in worker_results)
+    searched = [iterations for best_move, iterations, nodes in worker_results if iterations]
+    if not searched:
+        # No move was searched, take the most promising one of the first worker
+        result.best_move = worker_results[0][0]
+        result.principal_variation = [result.best_move]
+        return result
+    result.depth = min(len(iterations) for iterations in searched)
+    for depth in range(1, result.depth + 1):
+        best_move, score, principal_variation = max(
+            (iterations[depth - 1] for iterations in searched), key=lambda item: item[1])
+        result.iterations.append((best_move, score, principal_variation))
+    result.best_move, result.score, result.principal_variation = result.iterations[-1]
+    return result
+
+
+class ParallelSearch:
+    """
+    Search of the best move of the turn player of a game on several processes
+
+    The moves of the turn player are split between the processes of a pool and each process
+    searches its moves on its own copy of the position, with its own transposition table. The
+    position is sent as a FEN string, so the positions played before it aren't known by the
+    workers and repetitions of them aren't detected. The results are merged by taking the move
+    with the highest score at the lowest depth completed by all the workers, see merge_results.
+
+    The pool is created on the first search and kept for the next ones. Call close, or use the
+    object as a context manager, to terminate its processes.
+
+    Args:
+        game (game.Game): game whose turn player is searched
+        processes (int): number of worker processes. Defaults to None (the number of cores)
+        max_depth (int): depth of the last iteration of each worker. Defaults to 64
+        time_limit (float): maximum duration of the search in seconds. Defaults to None
+        node_limit (int): maximum number of positions visited by each worker. Defaults to None
+        table_size (float): size of the transposition table of each worker in megabytes.
+            Defaults to 16
+
+    Attributes:
+        pool (multiprocessing.pool.Pool): worker processes, None until the first search
+    """
+    def __init__(self, game, processes=None, max_depth=max_ply, time_limit=None,
+                 node_limit=None, table_size=16):
+        self.__game = game
+        self.__processes = processes if processes is not None else cpu_count()
+        self.__max_depth = max_depth
+        self.__time_limit = time_limit
+        self.__node_limit = node_limit
+        self.__table_size = table_size
+        self.__pool = None
+
+    @property
+    def processes(self):
+        return self.__processes
+
+    def run(self):
+        """
+        Search the best move of the current position of the game
+
+        Returns:
+            a SearchResult object. Its depth is the lowest depth completed by the workers that
+            searched their moves and its nodes are the sum of the positions visited by all of
+            them
+        """
+        start = perf_counter()
+        result = SearchResult()
+        root_moves = self.__game.legal_moves()
+        if not root_moves:
+            result.time = perf_counter() - start
+            return result
+        if self.__pool is None:
+            self.__pool = Pool(self.__processes)
+        fen = self.__game.to_fen()
+        # Each worker takes every n-th move, so the captures and quiet moves of each piece are
+        # spread between them instead of being searched by the same process
+        worker_count = min(self.__processes, len(root_moves))
+        tasks = [(fen, root_moves[index::worker_count], self.__max_depth, self.__time_limit,
+                  self.__node_limit, self.__table_size) for index in range(worker_count)]
+        result = merge_results(self.__pool.map(search_root_moves, tasks))
+        result.time = perf_counter() - start
+        return result
+
+    def close(self):
+        """Terminate the worker processes"""
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
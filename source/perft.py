@@ -0,0 +1,105 @@
+"""
+Perft benchmark of the move generation
+
+Counts the positions reached from reference positions and compares them with known values.
+Every change on the move generation must keep these numbers.
+
+Usage:
+    python -m source.perft [--depth DEPTH] [--position NAME] [--divide]
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+from source import Game
+from source.moves import get_move_name
+
+# Reference positions with the number of positions reached at each depth, starting at 1
+reference_positions = {
+    "start": ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+              [20, 400, 8902, 197281, 4865609]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                 [48, 2039, 97862, 4085603]),
+    "en-passant": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+                   [14, 191, 2812, 43238, 674624]),
+    "en-passant-square": ("rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+                          [30, 865, 25743]),
+    "promotion": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+                  [6, 264, 9467, 422333]),
+    "promotion-castling": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+                           [44, 1486, 62379, 2103487]),
+}
+
+
+def run_perft(name, depth):
+    """
+    Run perft on a reference position and print the result of each depth up to the given one
+
+    Args:
+        name (str): name of the reference position
+        depth (int): maximum depth
+
+    Returns:
+        True if all the counts match the known values
+    """
+    fen, expected_nodes = reference_positions[name]
+    game = Game.from_fen(fen)
+    passed = True
+    for current_depth in range(1, depth + 1):
+        start = perf_counter()
+        nodes = game.perft(current_depth)
+        elapsed = perf_counter() - start
+        expected = None
+        if current_depth <= len(expected_nodes):
+            expected = expected_nodes[current_depth - 1]
+        if expected is None:
+            result = "?"
+        elif nodes == expected:
+            result = "ok"
+        else:
+            result = f"FAILED (expected {expected})"
+            passed = False
+        nodes_per_second = nodes / elapsed if elapsed > 0 else 0
+        print(f"{name:<20} depth {current_depth}: {nodes:>10} nodes "
+              f"{elapsed:8.2f}s {nodes_per_second:10.0f} nodes/s  {result}")
+    return passed
+
+
+def run_divide(name, depth):
+    """
+    Print the number of positions reached after each move of a reference position
+
+    Args:
+        name (str): name of the reference position
+        depth (int): depth of the count, including the first move
+    """
+    fen = reference_positions[name][0]
+    game = Game.from_fen(fen)
+    nodes = game.divide(depth)
+    for move in sorted(nodes, key=get_move_name):
+        print(f"{get_move_name(move)}: {nodes[move]}")
+    print(f"\nmoves: {len(nodes)}\nnodes: {sum(nodes.values())}")
+
+
+def main():
+    parser = ArgumentParser(description="Perft benchmark of the move generation")
+    parser.add_argument("--depth", type=int, default=3, help="maximum depth (default: 3)")
+    parser.add_argument("--position", choices=reference_positions,
+                        help="run only this reference position")
+    parser.add_argument("--divide", action="store_true",
+                        help="count the positions after each move, needs --position")
+    args = parser.parse_args()
+    if args.divide:
+        if args.position is None:
+            parser.error("--divide needs --position")
+        run_divide(args.position, args.depth)
+        return
+    names = [args.position] if args.position else list(reference_positions)
+    passed = True
+    for name in names:
+        passed = run_perft(name, args.depth) and passed
+    if not passed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
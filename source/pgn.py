@@ -0,0 +1,342 @@
+"""
+Reading and writing of games in Portable Game Notation
+
+read_games is a generator that reads a PGN file line by line and yields one game at a time,
+so an archive of any size is processed with the memory of a single game. The moves are kept
+in Standard Algebraic Notation (SAN) and are resolved against the legal moves of game.Game
+by replay_game. Comments, variations, numeric annotation glyphs and the "e.p." suffix are
+skipped.
+
+Usage:
+    python -m source.pgn FILE
+"""
+from argparse import ArgumentParser
+import re
+
+from source import Game, InvalidMoveException
+from source.moves import castling_flag, move_mask, get_origin, get_destination, get_promotion
+from source.moves import to_tuple, get_square_name
+
+start_fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Tags that every exported game has, in the order of the PGN standard
+seven_tag_roster = ("Event", "Site", "Date", "Round", "White", "Black", "Result")
+results = ("1-0", "0-1", "1/2-1/2", "*")
+
+san_symbols = {"knight": "N", "bishop": "B", "rook": "R", "queen": "Q", "king": "K"}
+san_types = {symbol: piece_type for piece_type, symbol in san_symbols.items()}
+castling_names = {6: "O-O", 2: "O-O-O"}
+
+tag_pattern = re.compile(r'\[\s*(\w+)\s*"((?:[^"\\]|\\.)*)"\s*\]')
+token_pattern = re.compile(r'1-0|0-1|1/2-1/2|\*|\d+\.+|\$\d+|[{}();]|[^\s{}();$]+')
+san_pattern = re.compile(r"([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$")
+
+
+class PgnGame:
+    """
+    Game read from a PGN file
+
+    Attributes:
+        tags (Dict[str, str]): tag pairs of the game, like "White" or "FEN"
+        moves (List[str]): moves in Standard Algebraic Notation, for example "Nf3" or "O-O"
+        result (str): "1-0", "0-1", "1/2-1/2" or "*" if it's unknown
+    """
+    def __init__(self, tags, moves, result):
+        self.tags = tags
+        self.moves = moves
+        self.result = result
+
+
+def _read_tokens(lines):
+    """
+    Yield the tag pairs and the tokens of the movetext of PGN lines, as tuples with the kind
+    of the token ("tag", "move" or "result") and its value. The state of the comments and
+    variations is kept between lines
+    """
+    in_comment = False
+    variation_depth = 0
+    for line in lines:
+        if not in_comment and line.startswith("%"):
+            continue  # Escaped line
+        if not in_comment and variation_depth == 0 and line.lstrip().startswith("["):
+            for name, value in tag_pattern.findall(line):
+                yield "tag", (name, value.replace('\\"', '"').replace("\\\\", "\\"))
+            continue
+        for token in token_pattern.findall(line):
+            if in_comment:
+                in_comment = token != "}"
+            elif token == "{":
+                in_comment = True
+            elif token == ";":
+                break  # Comment until the end of the line
+            elif token == "(":
+                variation_depth += 1
+            elif token == ")":
+                variation_depth = max(variation_depth - 1, 0)
+            elif variation_depth or token[0] in ".$" or token[0].isdigit() and "." in token:
+                continue  # Move of a variation, move number or annotation glyph
+            elif token == "e.p.":
+                continue  # Optional suffix of an en passant capture
+            elif token in results:
+                yield "result", token
+            else:
+                yield "move", token
+
+
+def read_games(pgn_file):
+    """
+    Yield the games of a PGN file, one at a time
+
+    Args:
+        pgn_file (Iterable[str]): file opened in text mode, or any iterable of its lines
+
+    Returns:
+        a generator of PgnGame objects
+    """
+    tags = {}
+    moves = []
+    for kind, value in _read_tokens(pgn_file):
+        if kind == "tag":
+            if moves:
+                # A game without result ended before the tags of the next one
+                yield PgnGame(tags, moves, tags.get("Result", "*"))
+                tags, moves = {}, []
+            name, tag_value = value
+            tags[name] = tag_value
+        elif kind == "move":
+            moves.append(value)
+        else:
+            yield PgnGame(tags, moves, value)
+            tags, moves = {}, []
+    if tags or moves:
+        yield PgnGame(tags, moves, tags.get("Result", "*"))
+
+
+def parse_san(game, san, legal_moves=None):
+    """
+    Return the legal move of the turn player written in Standard Algebraic Notation
+
+    Args:
+        game (game.Game)
+        san (str): move in Standard Algebraic Notation, for example "Nbd7", "exd6" or "e8=Q+"
+        legal_moves (List[int]): legal moves of the turn player, if they're already known.
+            Defaults to None (they're generated)
+
+    Returns:
+        the move encoded as an integer, with its flags (see moves.py)
+    """
+    if legal_moves is None:
+        legal_moves = game.legal_moves()
+    text = san.rstrip("+#!?").replace("0", "O")
+    if text in ("O-O", "O-O-O"):
+        candidates = [move for move in legal_moves if move & castling_flag and
+                      castling_names[get_destination(move)[0]] == text]
+    else:
+        match = san_pattern.match(text)
+        if match is None:
+            raise ValueError(f"{san} isn't a move in Standard Algebraic Notation")
+        symbol, column, line, square, promotion_symbol = match.groups()
+        piece_type = san_types[symbol] if symbol else "pawn"
+        destination = (ord(square[0]) - ord("a"), 8 - int(square[1]))
+        promotion = san_types[promotion_symbol] if promotion_symbol else None
+        board = game.board
+        candidates = []
+        for move in legal_moves:
+            origin = get_origin(move)
+            if (get_destination(move) != destination or get_promotion(move) != promotion or
+                    board.get(*origin).type != piece_type):
+                continue
+            if column is not None and origin[0] != ord(column) - ord("a"):
+                continue
+            if line is not None and origin[1] != 8 - int(line):
+                continue
+            candidates.append(move)
+    if not candidates:
+        raise InvalidMoveException(f"{san} isn't a legal move")
+    if len(candidates) > 1:
+        raise InvalidMoveException(f"{san} is ambiguous")
+    return candidates[0]
+
+
+def _get_san_without_suffix(game, move, legal_moves):
+    # SAN of a legal move before it's played, without the check or checkmate suffix
+    origin, destination, promotion = to_tuple(move)
+    if move & castling_flag:
+        return castling_names[destination[0]]
+    board = game.board
+    piece = board.get(*origin)
+    capture = "x" if board.get(*destination) is not None or \
+        piece.type == "pawn" and origin[0] != destination[0] else ""
+    if piece.type == "pawn":
+        # A pawn capture starts with the column the pawn came from
+        san = get_square_name(origin)[0] + capture if capture else ""
+        san += get_square_name(destination)
+        if promotion is not None:
+            san += "=" + san_symbols[promotion]
+        return san
+    # Other pieces of the same type that can move to the same square
+    rivals = [get_origin(legal_move) for legal_move in legal_moves
+              if get_destination(legal_move) == destination and get_origin(legal_move) != origin
+              and board.get(*get_origin(legal_move)).type == piece.type]
+    disambiguation = ""
+    if rivals:
+        origin_name = get_square_name(origin)
+        if all(rival[0] != origin[0] for rival in rivals):
+            disambiguation = origin_name[0]
+        elif all(rival[1] != origin[1] for rival in rivals):
+            disambiguation = origin_name[1]
+        else:
+            disambiguation = origin_name
+    return san_symbols[piece.type] + disambiguation + capture + get_square_name(destination)
+
+
+def _get_legal_move(legal_moves, move):
+    # Legal move, with its flags, that has the origin, destination and promotion of a move
+    for legal_move in legal_moves:
+        if legal_move & move_mask == move & move_mask:
+            return legal_move
+    raise InvalidMoveException("The move isn't legal")
+
+
+def _get_check_suffix(game):
+    # Suffix of the move that has just been played: "#" for checkmate and "+" for check
+    if not game.get_king_in_check():
+        return ""
+    return "+" if game.legal_moves() else "#"
+
+
+def get_san(game, move):
+    """
+    Return a legal move of the turn player in Standard Algebraic Notation
+
+    Args:
+        game (game.Game)
+        move (int): move encoded as an integer (see moves.py)
+    """
+    legal_moves = game.legal_moves()
+    san = _get_san_without_suffix(game, move, legal_moves)
+    game.play(move)
+    san += _get_check_suffix(game)
+    game.undo()
+    return san
+
+
+def replay_game(pgn_game):
+    """
+    Play the moves of a PGN game, checking that all of them are legal
+
+    Args:
+        pgn_game (PgnGame)
+
+    Returns:
+        the game.Game after the last move
+    """
+    if "FEN" in pgn_game.tags:
+        game = Game.from_fen(pgn_game.tags["FEN"])
+    else:
+        game = Game()
+        game.init_new_game_board()
+    for ply, san in enumerate(pgn_game.moves):
+        try:
+            game.play(parse_san(game, san))
+        except (ValueError, InvalidMoveException) as error:
+            number = ply // 2 + 1
+            raise InvalidMoveException(f"Move {number}{'.' if ply % 2 == 0 else '...'} "
+                                       f"{san}: {error}") from error
+    return game
+
+
+def get_result(game):
+    """Return the PGN result of a game: "1-0", "0-1", "1/2-1/2" or "*" if it didn't end"""
+    status = game.status
+    if status == 0:
+        return "*"
+    if status == 1:
+        return "1-0" if game.turn == "black" else "0-1"
+    return "1/2-1/2"
+
+
+def to_pgn(game, tags=None):
+    """
+    Return the moves played on a game in Portable Game Notation
+
+    Args:
+        game (game.Game)
+        tags (Dict[str, str]): tag pairs of the game. The ones of the seven tag roster that
+            are missing are written as "?", and the result is taken from the game status.
+            Defaults to None
+
+    Returns:
+        the text of the game, with the movetext lines wrapped at 80 characters
+    """
+    tags = dict(tags or {})
+    tags.setdefault("Result", get_result(game))
+    if game.initial_fen != start_fen:
+        tags.setdefault("SetUp", "1")
+        tags.setdefault("FEN", game.initial_fen)
+    names = list(seven_tag_roster) + [name for name in tags if name not in seven_tag_roster]
+    lines = []
+    for name in names:
+        value = tags.get(name, "?").replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'[{name} "{value}"]')
+    lines.append("")
+    replay = Game.from_fen(game.initial_fen, game.initial_captured_pieces)
+    number = int(game.initial_fen.split()[5])
+    tokens = [f"{number}..."] if replay.turn == "black" else []
+    for move in game.get_played_moves():
+        if replay.turn == "white":
+            tokens.append(f"{number}.")
+        legal_moves = replay.legal_moves()
+        move = _get_legal_move(legal_moves, move)
+        san = _get_san_without_suffix(replay, move, legal_moves)
+        replay.play(move)
+        tokens.append(san + _get_check_suffix(replay))
+        if replay.turn == "white":
+            number += 1
+    tokens.append(tags["Result"])
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > 80:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def write_game(pgn_file, game, tags=None):
+    """
+    Append a game to a PGN file, followed by an empty line
+
+    Args:
+        pgn_file (TextIO): file opened in text mode
+        game (game.Game)
+        tags (Dict[str, str]): tag pairs of the game, see to_pgn. Defaults to None
+    """
+    pgn_file.write(to_pgn(game, tags) + "\n")
+
+
+def main():
+    parser = ArgumentParser(description="Replay the games of a PGN file checking their moves")
+    parser.add_argument("file", help="PGN file")
+    args = parser.parse_args()
+    games = 0
+    invalid_games = 0
+    with open(args.file, encoding="utf-8", errors="replace") as pgn_file:
+        for pgn_game in read_games(pgn_file):
+            games += 1
+            try:
+                replay_game(pgn_game)
+            except InvalidMoveException as error:
+                invalid_games += 1
+                white = pgn_game.tags.get("White", "?")
+                black = pgn_game.tags.get("Black", "?")
+                print(f"game {games} ({white} - {black}): {error}")
+    print(f"games: {games}\ninvalid: {invalid_games}")
+    if invalid_games:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,214 +1,238 @@
-class Piece:
-    def __init__(self, type, color, position):
-        self._type = type
-        self._color = color
-        self._position = position
-        self._image = f"images/pieces/{color}/{type}.png"
-        self.moved = False
+def _get_jump_targets(deltas):
+    """
+    Return the squares reached from each square by adding each delta, indexed by column and
+    line. The squares out of the board are left out
+    """
+    return [[[(column + x, line + y) for x, y in deltas
+              if 0 <= column + x <= 7 and 0 <= line + y <= 7]
+             for line in range(8)]
+            for column in range(8)]
+
+
+def _get_rays(directions):
+    """
+    Return the rays that start on each square, indexed by column and line. A ray is the list
+    of squares from the nearest to the edge of the board in one direction. Empty rays are left
+    out
+    """
+    rays = [[[] for line in range(8)] for column in range(8)]
+    for column in range(8):
+        for line in range(8):
+            for x, y in directions:
+                ray = []
+                ray_column, ray_line = column + x, line + y
+                while 0 <= ray_column <= 7 and 0 <= ray_line <= 7:
+                    ray.append((ray_column, ray_line))
+                    ray_column += x
+                    ray_line += y
+                if ray:
+                    rays[column][line].append(ray)
+    return rays
+
+
+def _get_pawn_advances(direction, initial_line):
+    """
+    Return the squares a pawn advances to from each square, indexed by column and line: the
+    square in front of it and, on its initial line, the square after that one
+    """
+    advances = [[[] for line in range(8)] for column in range(8)]
+    for column in range(8):
+        for line in range(8):
+            if not 0 <= line + direction <= 7:
+                continue
+            advances[column][line].append((column, line + direction))
+            if line == initial_line:
+                advances[column][line].append((column, line + direction * 2))
+    return advances
 
-    @property
-    def type(self):
-        return self._type
 
-    @property
-    def color(self):
-        return self._color
+# Colors and types of the pieces. Their indexes are the color and type codes of the pieces
+colors = ("white", "black")
+piece_types = ("pawn", "knight", "bishop", "rook", "queen", "king")
 
-    @property
-    def position(self):
-        return self._position
 
-    @position.setter
-    def position(self, new_position):
-        self._position = new_position
+class Piece:
+    """
+    Base class of the pieces
+
+    The pieces use slots instead of a dict, as a game keeps many of them. The type is a class
+    attribute and the color is also stored as a small integer, so tables can be indexed by
+    the piece code instead of hashing the color and type strings.
+
+    Attributes:
+        type (str): type of the piece, the same for all the pieces of a class
+        type_code (int): index of the type in piece_types
+        color (str): "white" or "black"
+        color_code (int): index of the color in colors
+        code (int): color_code * 6 + type_code, a different number from 0 to 11 for each color
+            and type
+        position (Tuple[int, int]): column and line of the piece
+        moved (bool): whether the piece has moved
+    """
+    __slots__ = ("color", "color_code", "code", "position", "moved")
+
+    type = None
+    type_code = None
 
-    @property
-    def image(self):
-        return self._image
+    def __init__(self, color, position):
+        self.color = color
+        self.color_code = colors.index(color)
+        self.code = self.color_code * 6 + self.type_code
+        self.position = position
+        self.moved = False
 
     def get_possible_moves(self):
         pass
 
-    def _is_possible(self, move):
-        # Check if the move is possible inside the board
-        move_column, move_line = move
-        if move_column > 7 or move_column < 0:
-            # Return false if move_column is out of the board
-            return False
-        if move_line > 7 or move_line < 0:
-            # Return false if move_line is out of the board
-            return False
-        if move == self._position:
-            return False
-        return True
+    def _get_jump_moves(self, board, targets):
+        # Moves to the target squares that aren't occupied by an allied piece
+        column, line = self.position
+        moves = []
+        for move in targets[column][line]:
+            piece = board.get(*move)
+            if piece is None or piece.color != self.color:
+                moves.append(move)
+        return moves
+
+    def _get_sliding_moves(self, board, rays):
+        # Moves along each ray until the first piece, including it if it's an enemy piece
+        column, line = self.position
+        moves = []
+        for ray in rays[column][line]:
+            for move in ray:
+                piece = board.get(*move)
+                if piece is None:
+                    moves.append(move)
+                    continue
+                if piece.color != self.color:
+                    moves.append(move)
+                break
+        return moves
 
 
 class Pawn(Piece):
+    __slots__ = ("direction",)
+
+    type = "pawn"
+    type_code = 0
+
     initial_positions = {"white": [(i, 6) for i in range(8)],
                          "black": [(i, 1) for i in range(8)]}
 
+    # Squares a pawn of each color advances to and captures on from each square. A square is
+    # attacked by the pawns of one color that stand on the capture squares of the other color
+    advances = {"white": _get_pawn_advances(-1, 6), "black": _get_pawn_advances(1, 1)}
+    captures = {"white": _get_jump_targets([(-1, -1), (1, -1)]),
+                "black": _get_jump_targets([(-1, 1), (1, 1)])}
+
     def __init__(self, color, position):
-        type = "pawn"
-        super().__init__(type, color, position)
+        super().__init__(color, position)
         # If the pawn is white, it moves up (-1), if it's black, it moves down (1)
-        self.__direction = -1 if color == "white" else 1
-
-    @property
-    def direction(self):
-        return self.__direction
+        self.direction = -1 if color == "white" else 1
 
     def get_possible_moves(self, board):
-        column, line = self._position
+        column, line = self.position
         moves = []
-        normal_move = column, line + self.__direction
-        if self._is_possible(normal_move) and board.is_empty(*normal_move):
-            moves.append(normal_move)
-            double_move = column, line + self.__direction * 2  # Pawn move that advance two squares
-            if not self.moved and self._is_possible(double_move) and board.is_empty(*double_move):
-                moves.append(double_move)
-        for x in (1, -1):
+        advances = self.advances[self.color][column][line]
+        if advances and board.is_empty(*advances[0]):
+            moves.append(advances[0])
+            # Pawn move that advance two squares
+            if len(advances) == 2 and not self.moved and board.is_empty(*advances[1]):
+                moves.append(advances[1])
+        for capture_move in self.captures[self.color][column][line]:
             # Check on each adjacent diagonal if there's an enemy piece to capture
-            capture_move = column + x, line + self.__direction
-            if self._is_possible(capture_move) and not board.is_empty(*capture_move):
-                piece = board.get(*capture_move)
-                if piece.color != self._color:
-                    moves.append(capture_move)
+            piece = board.get(*capture_move)
+            if piece is not None and piece.color != self.color:
+                moves.append(capture_move)
         return moves
 
 
 class Knight(Piece):
+    __slots__ = ()
+
+    type = "knight"
+    type_code = 1
+
     initial_positions = {"white": [(1, 7), (6, 7)],
                          "black": [(1, 0), (6, 0)]}
 
-    def __init__(self, color, position):
-        type = "knight"
-        super().__init__(type, color, position)
+    # For each move, the difference between the current column and line
+    # and the column and line of the possible move
+    deltas = [(-1, -2), (1, -2), (-1, 2), (1, 2), (-2, -1), (-2, 1), (2, -1), (2, 1)]
+    # Squares reached from each square, indexed by column and line
+    targets = _get_jump_targets(deltas)
 
     def get_possible_moves(self, board):
-        column, line = self._position
-        moves = []
-        # For each move, the difference between the current column and line
-        # and the column and line of the possible move
-        deltas = [(-1, -2), (1, -2), (-1, 2), (1, 2), (-2, -1), (-2, 1), (2, -1), (2, 1)]
-        for x, y in deltas:
-            move = column + x, line + y
-            if not self._is_possible(move):
-                continue
-            if not board.is_empty(*move):
-                piece = board.get(*move)
-                if piece.color == self._color:
-                    continue
-            moves.append(move)
-        return moves
+        return self._get_jump_moves(board, self.targets)
 
 
 class Rook(Piece):
+    __slots__ = ()
+
+    type = "rook"
+    type_code = 3
+
     initial_positions = {"white": [(0, 7), (7, 7)],
                          "black": [(0, 0), (7, 0)]}
 
-    def __init__(self, color, position):
-        type = "rook"
-        super().__init__(type, color, position)
+    directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+    # Rays that start on each square, indexed by column and line
+    rays = _get_rays(directions)
 
     def get_possible_moves(self, board):
-        column, line = self._position
-        moves = []
-        directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-        for x, y in directions:
-            current_column, current_line = column, line
-            while True:
-                current_column += x
-                current_line += y
-                move = current_column, current_line
-                if not self._is_possible(move):
-                    break
-                if not board.is_empty(*move):
-                    piece = board.get(*move)
-                    if piece.color != self._color:
-                        moves.append(move)
-                    break
-                moves.append(move)
-        return moves
+        return self._get_sliding_moves(board, self.rays)
 
 
 class Bishop(Piece):
+    __slots__ = ()
+
+    type = "bishop"
+    type_code = 2
+
     initial_positions = {"white": [(2, 7), (5, 7)],
                          "black": [(2, 0), (5, 0)]}
 
-    def __init__(self, color, position):
-        type = "bishop"
-        super().__init__(type, color, position)
+    directions = [(-1, -1), (1, -1), (1, 1), (-1, 1)]
+    # Rays that start on each square, indexed by column and line
+    rays = _get_rays(directions)
 
     def get_possible_moves(self, board):
-        column, line = self._position
-        moves = []
-        directions = [(-1, -1), (1, -1), (1, 1), (-1, 1)]
-        for x, y in directions:
-            current_column, current_line = column, line
-            while True:
-                current_column += x
-                current_line += y
-                move = current_column, current_line
-                if not self._is_possible(move):
-                    break
-                if not board.is_empty(*move):
-                    piece = board.get(*move)
-                    if piece.color != self._color:
-                        moves.append(move)
-                    break
-                moves.append(move)
-        return moves
+        return self._get_sliding_moves(board, self.rays)
 
 
 class Queen(Piece):
+    __slots__ = ()
+
+    type = "queen"
+    type_code = 4
+
     initial_positions = {"white": [(3, 7)],
                          "black": [(3, 0)]}
 
-    def __init__(self, color, position):
-        type = "queen"
-        super().__init__(type, color, position)
+    directions = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
+    # Rays that start on each square, indexed by column and line
+    rays = _get_rays(directions)
 
     def get_possible_moves(self, board):
-        column, line = self._position
-        moves = []
-        directions = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
-        for x, y in directions:
-            current_column, current_line = column, line
-            while True:
-                current_column += x
-                current_line += y
-                move = current_column, current_line
-                if not self._is_possible(move):
-                    break
-                if not board.is_empty(*move):
-                    piece = board.get(*move)
-                    if piece.color != self._color:
-                        moves.append(move)
-                    break
-                moves.append(move)
-        return moves
+        return self._get_sliding_moves(board, self.rays)
 
 
 class King(Piece):
+    __slots__ = ("in_check",)
+
+    type = "king"
+    type_code = 5
+
     initial_positions = {"white": [(4, 7)],
                          "black": [(4, 0)]}
 
+    deltas = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+    # Squares reached from each square, indexed by column and line
+    targets = _get_jump_targets(deltas)
+
     def __init__(self, color, position):
-        type = "king"
-        super().__init__(type, color, position)
+        super().__init__(color, position)
         self.in_check = False
 
     def get_possible_moves(self, board):
-        column, line = self._position
-        moves = []
-        for x in (-1, 0, 1):
-            for y in (-1, 0, 1):
-                move = column + x, line + y
-                if not self._is_possible(move):
-                    continue
-                if not board.is_empty(*move):
-                    piece = board.get(*move)
-                    if piece.color == self._color:
-                        continue
-                moves.append(move)
-        return moves
+        return self._get_jump_moves(board, self.targets)
@@ -0,0 +1,228 @@
+"""
+Binary format of the saved games
+
+A saved game file has the following layout, with the integers in little endian:
+
+    - magic bytes b"MCSG" and the version of the format (1 byte)
+    - the current position
+    - the position when the first move was played
+    - the number of moves played (2 bytes) and each move (2 bytes), encoded as in moves.py
+      without the flags
+
+Each position is stored as:
+
+    - the pieces placement, 4 bits for each square numbered line by line: 0 for an empty
+      square or the code of the piece plus 1 (see pieces.Piece)
+    - a byte with the turn player on the bit 0 and the castling rights K, Q, k and q on the
+      bits 1 to 4
+    - the column of the pawn that can suffer en passant plus 1, 0 if there isn't any (1 byte)
+    - the halfmove clock and the fullmove number (2 bytes each)
+    - the captured white pieces and then the captured black pieces: the number of pieces
+      (1 byte) and the type code of each one (1 byte each)
+
+The current position is enough to preview a game. The moves are replayed from the first
+position when the game is loaded, so the repetition history and the moves to take back are
+kept. Files of the old text format, a Python list written by Game.get_game_data, are still
+read, without evaluating them.
+"""
+from ast import literal_eval
+import struct
+
+from source import Game
+from source.game import fen_symbols
+from source.moves import move_mask
+from source.pieces import colors, piece_types
+
+magic = b"MCSG"
+version = 1
+
+castling_symbols = "KQkq"
+
+
+class GameSummary:
+    """
+    Information shown on the preview of a saved game
+
+    Attributes:
+        turn (str): player that makes the next move
+        pieces (List[Tuple[str, str, int, int]]): color, type, column and line of each piece
+        captured_pieces (Dict[str, List[str]]): types of the captured pieces sorted by color
+    """
+    def __init__(self, turn, pieces, captured_pieces):
+        self.turn = turn
+        self.pieces = pieces
+        self.captured_pieces = captured_pieces
+
+
+def pack_position(fen, captured_pieces):
+    """
+    Return the bytes of a position
+
+    Args:
+        fen (str): position in Forsyth-Edwards Notation
+        captured_pieces (Dict[str, List[str]]): types of the captured pieces sorted by color
+    """
+    placement, turn, castling, en_passant, halfmove_clock, fullmove_number = fen.split()
+    squares = []
+    for rank in placement.split("/"):
+        for symbol in rank:
+            if symbol.isdigit():
+                squares += [0] * int(symbol)
+            else:
+                squares.append(fen_symbols.index(symbol) + 1)
+    data = bytearray(squares[index] | squares[index + 1] << 4 for index in range(0, 64, 2))
+    flags = 1 if turn == "b" else 0
+    for bit, symbol in enumerate(castling_symbols, 1):
+        if symbol in castling:
+            flags |= 1 << bit
+    en_passant_column = 0 if en_passant == "-" else ord(en_passant[0]) - ord("a") + 1
+    data += struct.pack("<BBHH", flags, en_passant_column, int(halfmove_clock),
+                        int(fullmove_number))
+    for color in colors:
+        pieces = captured_pieces[color]
+        data.append(len(pieces))
+        data += bytes(piece_types.index(piece_type) for piece_type in pieces)
+    return bytes(data)
+
+
+def unpack_position(data, offset=0):
+    """
+    Read a position written by pack_position
+
+    Args:
+        data (bytes): content of the file
+        offset (int): index of the first byte of the position. Defaults to 0
+
+    Returns:
+        a tuple with the FEN of the position, the captured pieces and the offset of the byte
+        after the position
+    """
+    ranks = []
+    for line in range(8):
+        rank = ""
+        empty_squares = 0
+        for column in range(0, 8, 2):
+            byte = data[offset + line * 4 + column // 2]
+            for value in (byte & 15, byte >> 4):
+                if value == 0:
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    rank += str(empty_squares)
+                    empty_squares = 0
+                rank += fen_symbols[value - 1]
+        if empty_squares:
+            rank += str(empty_squares)
+        ranks.append(rank)
+    offset += 32
+    flags, en_passant_column, halfmove_clock, fullmove_number = \
+        struct.unpack_from("<BBHH", data, offset)
+    offset += 6
+    turn = "b" if flags & 1 else "w"
+    castling = "".join(symbol for bit, symbol in enumerate(castling_symbols, 1)
+                       if flags & 1 << bit)
+    en_passant = "-"
+    if en_passant_column:
+        # The en passant square is behind the pawn that moved two squares
+        en_passant = f"{'abcdefgh'[en_passant_column - 1]}{'6' if turn == 'w' else '3'}"
+    fen = (f"{'/'.join(ranks)} {turn} {castling or '-'} {en_passant} {halfmove_clock} "
+           f"{fullmove_number}")
+    captured_pieces = {}
+    for color in colors:
+        count = data[offset]
+        type_codes = data[offset + 1:offset + 1 + count]
+        captured_pieces[color] = [piece_types[type_code] for type_code in type_codes]
+        offset += 1 + count
+    return fen, captured_pieces, offset
+
+
+def save_game(game, path):
+    """
+    Write a game on a file in the binary format
+
+    Args:
+        game (game.Game)
+        path (str): path of the file
+    """
+    played_moves = game.get_played_moves()
+    data = bytearray(magic)
+    data.append(version)
+    data += pack_position(game.to_fen(), game.captured_pieces)
+    data += pack_position(game.initial_fen, game.initial_captured_pieces)
+    data += struct.pack(f"<H{len(played_moves)}H", len(played_moves),
+                        *(move & move_mask for move in played_moves))
+    with open(path, "wb") as game_file:
+        game_file.write(data)
+
+
+def load_game(path):
+    """
+    Read a game saved on a file, in the binary or in the old text format
+
+    Args:
+        path (str): path of the file
+
+    Returns:
+        a game.Game object
+    """
+    with open(path, "rb") as game_file:
+        data = game_file.read()
+    if not data.startswith(magic):
+        game = Game()
+        game.load_saved_game_board(_read_text_format(data))
+        return game
+    _check_version(data)
+    fen, captured_pieces, offset = unpack_position(data, len(magic) + 1)
+    initial_fen, initial_captured_pieces, offset = unpack_position(data, offset)
+    move_count, = struct.unpack_from("<H", data, offset)
+    played_moves = struct.unpack_from(f"<{move_count}H", data, offset + 2)
+    game = Game.from_fen(initial_fen, initial_captured_pieces)
+    for move in played_moves:
+        game.play(move)
+    if game.to_fen() != fen:
+        raise ValueError("The moves of the saved game don't lead to its current position")
+    return game
+
+
+def read_summary(path):
+    """
+    Read only the information needed to preview a saved game, in the binary or in the old
+    text format
+
+    Args:
+        path (str): path of the file
+
+    Returns:
+        a GameSummary object
+    """
+    with open(path, "rb") as game_file:
+        data = game_file.read()
+    if not data.startswith(magic):
+        game_state = _read_text_format(data)
+        pieces = []
+        for piece_data in game_state[:-3]:
+            color, piece_type, column, line = piece_data.split()[:4]
+            pieces.append((color, piece_type, int(column), int(line)))
+        return GameSummary(game_state[-3], pieces, game_state[-1])
+    _check_version(data)
+    offset = len(magic) + 1
+    pieces = []
+    for square in range(64):
+        byte = data[offset + square // 2]
+        value = byte >> 4 if square % 2 else byte & 15
+        if value:
+            color_code, type_code = divmod(value - 1, 6)
+            pieces.append((colors[color_code], piece_types[type_code], square % 8, square // 8))
+    turn = "black" if data[offset + 32] & 1 else "white"
+    captured_pieces = unpack_position(data, offset)[1]
+    return GameSummary(turn, pieces, captured_pieces)
+
+
+def _check_version(data):
+    if data[len(magic)] > version:
+        raise ValueError(f"Saved game format version {data[len(magic)]} isn't supported")
+
+
+def _read_text_format(data):
+    # The old format is the str of a list of literals, so it's parsed without running it
+    return literal_eval(data.decode("utf-8"))
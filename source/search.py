@@ -0,0 +1,334 @@
+from time import perf_counter
+
+from source.evaluation import evaluate, piece_values
+from source.moves import capture_flag, promotion_mask, positions, get_promotion
+from source.transposition import TranspositionTable, exact_bound, lower_bound, upper_bound
+
+# Score of a checkmate. A mate in n moves scores mate_score - n, so the shortest mate is chosen
+mate_score = 100000
+max_ply = 64
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when its time or node budget runs out or it's stopped"""
+    pass
+
+
+class SearchResult:
+    """
+    Result of a search
+
+    Attributes:
+        best_move (int): best move found, encoded as an integer (see moves.py). None if the
+            turn player doesn't have any valid move
+        score (int): score of the best move in centipawns for the turn player
+        depth (int): depth of the last search iteration that was completed
+        principal_variation (List[int]): sequence of moves that the search expects to be
+            played, starting with the best move
+        nodes (int): number of positions visited
+        time (float): duration of the search in seconds
+        iterations (List[Tuple[int, int, List[int]]]): best move, score and principal
+            variation of each completed iteration, the first one is depth 1
+    """
+    def __init__(self):
+        self.best_move = None
+        self.score = 0
+        self.depth = 0
+        self.principal_variation = []
+        self.nodes = 0
+        self.time = 0.0
+        self.iterations = []
+
+
+class Search:
+    """
+    Search of the best move of the turn player of a game
+
+    Negamax with alpha-beta pruning and iterative deepening, followed by a quiescence search of
+    the captures. The moves are ordered by the best move stored in the transposition table or
+    the principal variation of the previous iteration, then captures by most valuable victim
+    and least valuable attacker, then killer moves and then the history heuristic. The moves
+    are played and taken back on the game itself, which is left as it was when the search ends.
+
+    Args:
+        game (game.Game): game whose turn player is searched
+        max_depth (int): depth of the last iteration. Defaults to 64
+        time_limit (float): maximum duration of the search in seconds. Defaults to None
+        node_limit (int): maximum number of visited positions. Defaults to None
+        transposition_table (transposition.TranspositionTable): table shared with other
+            searches. Defaults to None (a new 16 MB table)
+        root_moves (List[int]): search only these moves of the turn player. Defaults to None
+            (all the valid moves)
+        stop_event (threading.Event): event that stops the search when it's set, from
+            another thread. Defaults to None
+
+    Attributes:
+        transposition_table (transposition.TranspositionTable): scores and best moves of the
+            positions already searched
+        nodes (int): number of positions visited
+        killer_moves (List[List[int]]): two quiet moves for each ply that caused a cutoff
+        history_scores (Dict[Tuple[str, int], int]): score of each quiet move, by color and
+            move, increased when the move causes a cutoff
+        principal_variations (List[List[int]]): best sequence found from each ply
+        previous_variation (List[int]): principal variation of the previous iteration
+        position_keys (List[int]): zobrist keys of the positions from the root to the
+            current one, to detect repetitions
+    """
+    def __init__(self, game, max_depth=max_ply, time_limit=None, node_limit=None,
+                 transposition_table=None, root_moves=None, stop_event=None):
+        self.__game = game
+        self.__root_moves = root_moves
+        self.__stop_event = stop_event
+        if transposition_table is None:
+            transposition_table = TranspositionTable()
+        self.__transposition_table = transposition_table
+        self.__max_depth = min(max_depth, max_ply)
+        self.__time_limit = time_limit
+        self.__node_limit = node_limit
+        self.__deadline = None
+        self.__nodes = 0
+        self.__killer_moves = [[None, None] for ply in range(max_ply + 1)]
+        self.__history_scores = {}
+        self.__principal_variations = [[] for ply in range(max_ply + 1)]
+        self.__previous_variation = []
+        self.__position_keys = []
+
+    @property
+    def nodes(self):
+        return self.__nodes
+
+    @property
+    def transposition_table(self):
+        return self.__transposition_table
+
+    def run(self):
+        """
+        Search the best move, deepening one ply at a time until the maximum depth or the
+        budget is reached. The result of an interrupted iteration is discarded
+
+        Returns:
+            a SearchResult object
+        """
+        start = perf_counter()
+        if self.__time_limit is not None:
+            self.__deadline = start + self.__time_limit
+        result = SearchResult()
+        root_moves = self.__root_moves
+        if root_moves is None:
+            root_moves = self.__root_moves = self.__game.legal_moves()
+        if root_moves:
+            result.best_move = self.__order_moves(root_moves, 0)[0]
+            result.principal_variation = [result.best_move]
+        self.__position_keys = [self.__game.zobrist_key]
+        for depth in range(1, self.__max_depth + 1):
+            if not root_moves:
+                break
+            try:
+                score = self.__negamax(depth, -mate_score - 1, mate_score + 1, 0)
+            except SearchTimeout:
+                break
+            self.__previous_variation = list(self.__principal_variations[0])
+            result.depth = depth
+            result.score = score
+            result.principal_variation = self.__previous_variation
+            result.best_move = self.__previous_variation[0]
+            result.iterations.append((result.best_move, score, result.principal_variation))
+            if abs(score) >= mate_score - max_ply:
+                # A forced mate was found, deeper iterations won't find a better move
+                break
+        result.nodes = self.__nodes
+        result.time = perf_counter() - start
+        return result
+
+    def __negamax(self, depth, alpha, beta, ply):
+        """
+        Return the score of the current position for its turn player
+
+        Args:
+            depth (int): remaining depth until the quiescence search
+            alpha (int): minimum score that the turn player is assured of
+            beta (int): maximum score that the opponent is assured of
+            ply (int): distance from the root position
+        """
+        if depth <= 0 or ply >= max_ply:
+            return self.__quiescence(alpha, beta, ply)
+        self.__count_node()
+        game = self.__game
+        self.__principal_variations[ply] = []
+        key = self.__position_keys[-1]
+        if ply > 0 and key in self.__position_keys[:-1]:
+            # A repeated position is a draw
+            return 0
+        entry = self.__transposition_table.probe(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, table_move = entry[1:]
+            score = self.__score_from_table(entry_score, ply)
+            if ply > 0 and entry_depth >= depth:
+                if bound == exact_bound or \
+                        bound == lower_bound and score >= beta or \
+                        bound == upper_bound and score <= alpha:
+                    if table_move is not None:
+                        self.__principal_variations[ply] = [table_move]
+                    return score
+        moves = self.__root_moves if ply == 0 else game.legal_moves()
+        if not moves:
+            if game.get_king_in_check() != 0:
+                return -mate_score + ply
+            return 0
+        original_alpha = alpha
+        best_score = -mate_score - 1
+        best_move = None
+        for move in self.__order_moves(moves, ply, table_move):
+            score = -self.__search_move(move, depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+                self.__principal_variations[ply] = [move] + self.__principal_variations[ply + 1]
+            if alpha >= beta:
+                if not move & (capture_flag | promotion_mask):
+                    self.__store_quiet_cutoff(move, depth, ply)
+                break
+        if best_score <= original_alpha:
+            bound = upper_bound
+        elif best_score >= beta:
+            bound = lower_bound
+        else:
+            bound = exact_bound
+        table_score = self.__score_to_table(best_score, ply)
+        self.__transposition_table.store(key, depth, table_score, bound, best_move)
+        return best_score
+
+    def __quiescence(self, alpha, beta, ply):
+        """
+        Search only captures and promotions until the position is quiet, so the evaluation
+        isn't made in the middle of an exchange. When in check all the moves are searched.
+
+        Args:
+            alpha (int): minimum score that the turn player is assured of
+            beta (int): maximum score that the opponent is assured of
+            ply (int): distance from the root position
+        """
+        self.__count_node()
+        game = self.__game
+        self.__principal_variations[ply] = []
+        in_check = game.get_king_in_check() != 0
+        stand_pat = evaluate(game.board, game.turn)
+        if ply >= max_ply:
+            return stand_pat
+        best_score = -mate_score - 1
+        if not in_check:
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            best_score = stand_pat
+        moves = game.legal_moves()
+        if not moves:
+            return -mate_score + ply if in_check else 0
+        if not in_check:
+            moves = [move for move in moves if move & (capture_flag | promotion_mask)]
+        for move in self.__order_moves(moves, ply):
+            score = -self.__search_move(move, 0, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+                self.__principal_variations[ply] = [move] + self.__principal_variations[ply + 1]
+            if alpha >= beta:
+                break
+        return best_score
+
+    def __search_move(self, move, depth, alpha, beta, ply):
+        """
+        Play a move, search the position after it and take it back
+
+        Returns:
+            the score of the position after the move for its turn player
+        """
+        game = self.__game
+        game.play(move)
+        self.__position_keys.append(game.zobrist_key)
+        try:
+            return self.__negamax(depth, alpha, beta, ply)
+        finally:
+            self.__position_keys.pop()
+            game.undo()
+
+    def __order_moves(self, moves, ply, table_move=None):
+        """
+        Sort the moves from the most to the least promising
+
+        Args:
+            moves (List[int]): moves of the turn player
+            ply (int): distance from the root position
+            table_move (int): best move stored in the transposition table. Defaults to None
+        """
+        board = self.__game.board
+        previous_move = None
+        if ply < len(self.__previous_variation):
+            previous_move = self.__previous_variation[ply]
+        killer_moves = self.__killer_moves[ply]
+        scores = {}
+        turn = self.__game.turn
+        for move in moves:
+            if move == table_move:
+                score = 1 << 31
+            elif move == previous_move:
+                score = 1 << 30
+            elif move & capture_flag:
+                # Most valuable victim, least valuable attacker
+                piece = board.get(*positions[move & 63])
+                victim = board.get(*positions[move >> 6 & 63])
+                victim_value = piece_values[victim.type] if victim else piece_values["pawn"]
+                score = (1 << 24) + victim_value * 10 - piece_values[piece.type]
+            elif move & promotion_mask:
+                score = (1 << 24) + piece_values[get_promotion(move)]
+            elif move == killer_moves[0]:
+                score = 1 << 22
+            elif move == killer_moves[1]:
+                score = (1 << 22) - 1
+            else:
+                score = self.__history_scores.get((turn, move), 0)
+            scores[move] = score
+        return sorted(moves, key=scores.get, reverse=True)
+
+    def __score_to_table(self, score, ply):
+        """
+        Return a score to be stored in the transposition table. Mate scores are stored as the
+        distance from the position instead of the distance from the root
+        """
+        if score >= mate_score - max_ply:
+            return score + ply
+        if score <= -mate_score + max_ply:
+            return score - ply
+        return score
+
+    def __score_from_table(self, score, ply):
+        """Return the score of a transposition table entry as seen from the current ply"""
+        if score >= mate_score - max_ply:
+            return score - ply
+        if score <= -mate_score + max_ply:
+            return score + ply
+        return score
+
+    def __store_quiet_cutoff(self, move, depth, ply):
+        """Update the killer moves and the history scores with a move that caused a cutoff"""
+        killer_moves = self.__killer_moves[ply]
+        if move != killer_moves[0]:
+            killer_moves[1] = killer_moves[0]
+            killer_moves[0] = move
+        key = self.__game.turn, move
+        self.__history_scores[key] = self.__history_scores.get(key, 0) + depth * depth
+
+    def __count_node(self):
+        """Count a visited position and stop the search if the budget ran out"""
+        if self.__node_limit is not None and self.__nodes >= self.__node_limit:
+            raise SearchTimeout()
+        self.__nodes += 1
+        if self.__nodes % 256 == 0:
+            if self.__deadline is not None and perf_counter() > self.__deadline:
+                raise SearchTimeout()
+            if self.__stop_event is not None and self.__stop_event.is_set():
+                raise SearchTimeout()
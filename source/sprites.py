@@ -0,0 +1,77 @@
+"""
+Images of the pieces shared by all the windows
+
+The files of the images are read once for the whole process and kept in memory. preload
+reads all of them on a background thread when the program starts, so the first board drawn
+doesn't wait for the disk. A tkinter.PhotoImage belongs to the Tk interpreter that created it
+and each window of the game runs on a new one, so the images are decoded once for each
+interpreter, on its thread, and shared by all the widgets of that interpreter.
+
+The images are identified by their set, the directory in images/ that gives their size:
+"pieces" for the board of the game and "mini-pieces" for the previews of the saved games.
+"""
+import base64
+import threading
+import tkinter as tk
+
+from source import realpath
+from source.pieces import colors, piece_types
+
+sprite_sets = ("pieces", "mini-pieces")
+
+# Content of each image file, encoded in base64, keyed by set, color and piece type
+_sprite_data = {}
+_preload_thread = None
+
+
+def _get_sprite_data(key):
+    # Dict operations are atomic, so at most the same file is read by two threads at once
+    data = _sprite_data.get(key)
+    if data is None:
+        sprite_set, color, piece_type = key
+        with open(f"{realpath}/images/{sprite_set}/{color}/{piece_type}.png", "rb") as image:
+            data = base64.b64encode(image.read()).decode("ascii")
+        _sprite_data[key] = data
+    return data
+
+
+def _read_all():
+    for sprite_set in sprite_sets:
+        for color in colors:
+            for piece_type in piece_types:
+                _get_sprite_data((sprite_set, color, piece_type))
+
+
+def preload():
+    """Start reading all the image files on a background thread, if it wasn't started yet"""
+    global _preload_thread
+    if _preload_thread is None:
+        _preload_thread = threading.Thread(target=_read_all, daemon=True)
+        _preload_thread.start()
+
+
+def get_sprite(widget, sprite_set, color, piece_type):
+    """
+    Return the image of a piece for the Tk interpreter of a widget. The image is created on
+    the first call and the same object is returned afterwards, so the widgets don't need to
+    keep a reference to it
+
+    Args:
+        widget (tkinter.Misc): any widget of the window that shows the image
+        sprite_set (str): "pieces" or "mini-pieces"
+        color (str): color of the piece
+        piece_type (str): type of the piece
+
+    Returns:
+        a tkinter.PhotoImage object
+    """
+    root = widget.nametowidget(".")
+    sprites = getattr(root, "sprites", None)
+    if sprites is None:
+        sprites = root.sprites = {}
+    key = (sprite_set, color, piece_type)
+    image = sprites.get(key)
+    if image is None:
+        image = tk.PhotoImage(master=root, data=_get_sprite_data(key))
+        sprites[key] = image
+    return image
@@ -0,0 +1,115 @@
+# Types of the score stored in an entry. An exact score was searched with the full window, a
+# lower bound caused a cutoff and an upper bound didn't reach alpha
+exact_bound = 0
+lower_bound = 1
+upper_bound = 2
+
+# Estimated memory used by each entry in bytes: the list slot, the entry tuple and its values
+entry_size = 200
+
+
+class TranspositionTable:
+    """
+    Fixed size table of searched positions keyed by their zobrist key
+
+    The table is split in buckets of two entries. The first entry of a bucket keeps the
+    position searched with the highest depth and the second one always keeps the last position
+    stored that didn't replace the first one.
+
+    Args:
+        size (float): maximum memory used by the table in megabytes. Defaults to 16
+
+    Attributes:
+        bucket_count (int): number of buckets
+        entries (List[Tuple]): entries of all buckets, the bucket i uses the entries 2i and 2i+1.
+            Each entry is a tuple (key, depth, score, bound, move) or None
+        hits (int): probes that found the position
+        misses (int): probes that didn't find the position
+        collisions (int): misses on a bucket that had other positions
+        stores (int): positions stored
+        overwrites (int): stores that replaced a different position
+    """
+    def __init__(self, size=16):
+        self.__bucket_count = max(1, int(size * 2 ** 20) // (2 * entry_size))
+        self.__entries = [None] * (2 * self.__bucket_count)
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @property
+    def bucket_count(self):
+        return self.__bucket_count
+
+    def probe(self, key):
+        """
+        Look for a position in the table
+
+        Args:
+            key (int): zobrist key of the position
+
+        Returns:
+            the entry of the position as a tuple (key, depth, score, bound, move) or None if
+            it isn't in the table
+        """
+        index = 2 * (key % self.__bucket_count)
+        entries = self.__entries
+        for entry in (entries[index], entries[index + 1]):
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+        self.misses += 1
+        if entries[index] is not None or entries[index + 1] is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        """
+        Store a searched position
+
+        Args:
+            key (int): zobrist key of the position
+            depth (int): depth of the search of the position
+            score (int): score of the position
+            bound (int): exact_bound, lower_bound or upper_bound
+            move (object): best move of the position or None
+        """
+        index = 2 * (key % self.__bucket_count)
+        entries = self.__entries
+        entry = key, depth, score, bound, move
+        self.stores += 1
+        deepest_entry = entries[index]
+        if deepest_entry is None or deepest_entry[0] == key or depth >= deepest_entry[1]:
+            if deepest_entry is not None and deepest_entry[0] != key:
+                self.overwrites += 1
+            entries[index] = entry
+            return
+        last_entry = entries[index + 1]
+        if last_entry is not None and last_entry[0] != key:
+            self.overwrites += 1
+        entries[index + 1] = entry
+
+    def clear(self):
+        """Remove all the positions and reset the statistics"""
+        self.__entries = [None] * (2 * self.__bucket_count)
+        self.hits = self.misses = self.collisions = self.stores = self.overwrites = 0
+
+    def get_statistics(self):
+        """
+        Return a dict with the table usage, useful to choose its size. For example:
+
+            {"size": 16.0, "entries": 83886, "used": 0.42, "hits": 1200, "misses": 3400,
+             "collisions": 800, "hit_rate": 0.26, "stores": 3300, "overwrites": 120}
+        """
+        used_entries = sum(entry is not None for entry in self.__entries)
+        probes = self.hits + self.misses
+        return {"size": len(self.__entries) * entry_size / 2 ** 20,
+                "entries": len(self.__entries),
+                "used": used_entries / len(self.__entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "collisions": self.collisions,
+                "hit_rate": self.hits / probes if probes else 0.0,
+                "stores": self.stores,
+                "overwrites": self.overwrites}
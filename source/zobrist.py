@@ -0,0 +1,21 @@
+from random import Random
+
+# The keys are generated with a fixed seed, so a position has the same key in every run
+_random = Random(2019)
+
+
+def _get_random_key():
+    return _random.getrandbits(64)
+
+
+# Key of each piece in each square, indexed by the code of the piece (see pieces.Piece) and
+# then by column and line
+piece_keys = [[[_get_random_key() for line in range(8)] for column in range(8)]
+              for code in range(12)]
+# Added to the key when black is the turn player
+turn_key = _get_random_key()
+# Key of each castling right, indexed by (color, side). The side is the column of the rook
+castling_keys = {(color, rook_column): _get_random_key()
+                 for color in ("white", "black") for rook_column in (0, 7)}
+# Key of the column of the pawn that can suffer en passant
+en_passant_keys = [_get_random_key() for column in range(8)]
@@ -0,0 +1,69 @@
+import time
+import unittest
+
+from source import Game
+from source.analysis import AnalysisService, get_status
+from source.moves import encode
+
+
+class FakeWidget:
+    """Widget whose after callbacks are called by poll instead of a Tk mainloop"""
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, interval, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, callback_id):
+        self.callbacks.pop(callback_id, None)
+
+    def poll(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+class AnalysisServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.widget = FakeWidget()
+        self.analysis = AnalysisService(self.widget)
+        self.results = []
+
+    def tearDown(self):
+        self.analysis.close()
+
+    def wait_results(self):
+        deadline = time.time() + 5
+        while not self.results and time.time() < deadline:
+            time.sleep(0.01)
+            self.widget.poll()
+        self.assertTrue(self.results)
+
+    def test_threefold_repetition(self):
+        # The repetitions are sent with the position, since the worker doesn't replay the moves
+        game = Game()
+        game.init_new_game_board()
+        knight_moves = [((6, 7), (5, 5)), ((6, 0), (5, 2)), ((5, 5), (6, 7)), ((5, 2), (6, 0))]
+        for origin, destination in knight_moves * 2 + knight_moves[:2]:
+            game.play(encode(origin, destination))
+        self.assertEqual(game.status, 3)
+        self.analysis.submit(game, get_status, self.results.append)
+        self.wait_results()
+        self.assertEqual(self.results, [3])
+
+    def test_error_callback(self):
+        def fail(game, stop_event):
+            raise ValueError("analysis failed")
+
+        game = Game()
+        game.init_new_game_board()
+        self.analysis.submit(game, fail, self.fail, self.results.append)
+        self.wait_results()
+        self.assertIsInstance(self.results[0], ValueError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import random
+import unittest
+
+import numpy as np
+
+from source import Game, BitBoard
+from source.batch_eval import encode_positions, get_material_scores, get_mobility_scores
+from source.batch_eval import get_pawn_structure_scores, evaluate_positions
+from source.evaluation import evaluate
+from source.perft import reference_positions
+
+
+def get_boards():
+    """Boards of the reference positions and of a random game"""
+    boards = [Game.from_fen(fen).board for fen, counts in reference_positions.values()]
+    generator = random.Random(7)
+    game = Game()
+    game.init_new_game_board()
+    for ply in range(60):
+        moves = game.legal_moves()
+        if not moves:
+            break
+        game.play(generator.choice(moves))
+        boards.append(Game.from_fen(game.to_fen()).board)
+    return boards
+
+
+class BatchEvalTest(unittest.TestCase):
+    def test_material_scores(self):
+        boards = get_boards()
+        scores = get_material_scores(encode_positions(boards))
+        self.assertEqual(scores.tolist(), [evaluate(board, "white") for board in boards])
+
+    def test_encode_bitboards(self):
+        boards = get_boards()
+        bitboards = [BitBoard.from_board(board) for board in boards]
+        np.testing.assert_array_equal(encode_positions(bitboards), encode_positions(boards))
+        # Both kinds of boards can be mixed
+        mixed = [board if index % 2 else bitboards[index] for index, board in enumerate(boards)]
+        np.testing.assert_array_equal(encode_positions(mixed), encode_positions(boards))
+
+    def test_mobility_scores(self):
+        # Knight on a1: b3 and c2, 2 * 4
+        # Rook on a1: a2 to a8 with the capture of the bishop and b1 to d1, 10 * 2
+        # Bishop on a8: b7 to h1, 7 * 5
+        fens = {"4k3/8/8/8/8/8/8/N3K3 w - - 0 1": 8,
+                "b3k3/8/8/8/8/8/8/R3K3 w - - 0 1": 20 - 35}
+        boards = [Game.from_fen(fen).board for fen in fens]
+        scores = get_mobility_scores(encode_positions(boards))
+        self.assertEqual(scores.tolist(), list(fens.values()))
+
+    def test_pawn_structure_scores(self):
+        # a2 and a3: doubled (15) and isolated (2 * 10), not passed because of b4
+        # b4: isolated (10), not passed because of a3
+        # d5: isolated (10) and passed on the line 5 (40)
+        # c3: isolated (10) and passed on the line 3 from the black point of view (60)
+        fens = {"4k3/8/8/8/1p6/P7/P7/4K3 w - - 0 1": -35 + 10,
+                "4k3/8/8/3P4/8/8/8/4K3 w - - 0 1": 30,
+                "4k3/8/8/8/8/2p5/8/4K3 w - - 0 1": -50}
+        boards = [Game.from_fen(fen).board for fen in fens]
+        scores = get_pawn_structure_scores(encode_positions(boards))
+        self.assertEqual(scores.tolist(), list(fens.values()))
+
+    def test_evaluate_positions(self):
+        boards = get_boards()
+        planes = encode_positions(boards)
+        scores = (get_material_scores(planes) + get_mobility_scores(planes) +
+                  get_pawn_structure_scores(planes))
+        self.assertEqual(evaluate_positions(boards).tolist(), scores.tolist())
+        self.assertEqual(evaluate_positions(planes, "black").tolist(), (-scores).tolist())
+        colors = ["white", "black"] * (len(boards) // 2) + ["white"] * (len(boards) % 2)
+        signs = np.array([1 if color == "white" else -1 for color in colors])
+        self.assertEqual(evaluate_positions(planes, colors).tolist(), (scores * signs).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import random
+import unittest
+
+from source import Board, BitBoard, Pawn, Knight, Bishop, Rook, Queen, King
+from source.pieces import colors
+
+piece_classes = (Pawn, Knight, Bishop, Rook, Queen, King)
+
+
+def get_random_board(generator):
+    """Board with both kings and up to 20 other pieces on random squares"""
+    board = Board()
+    squares = [(column, line) for column in range(8) for line in range(8)]
+    generator.shuffle(squares)
+    pieces = [King("white", squares.pop()), King("black", squares.pop())]
+    for position in squares[:generator.randint(0, 20)]:
+        piece_class = generator.choice(piece_classes[:5])
+        color = generator.choice(colors)
+        if piece_class is Pawn:
+            if position[1] in (0, 7):
+                continue
+            piece = Pawn(color, position)
+            # A pawn can only advance two squares from its initial line
+            piece.moved = position[1] != (6 if color == "white" else 1)
+        else:
+            piece = piece_class(color, position)
+            piece.moved = generator.random() < 0.5
+        pieces.append(piece)
+    for piece in pieces:
+        board.add(piece)
+    return board
+
+
+def get_pieces(board):
+    return sorted((piece.position, piece.color, piece.type, piece.moved) for piece in board)
+
+
+class BitBoardTest(unittest.TestCase):
+    def setUp(self):
+        generator = random.Random(2024)
+        self.boards = [get_random_board(generator) for index in range(500)]
+
+    def test_generate_moves(self):
+        for board in self.boards:
+            bitboard = BitBoard.from_board(board)
+            for color in colors:
+                expected = sorted((piece.position, move) for piece in board.get_all_where(color)
+                                  for move in piece.get_possible_moves(board))
+                self.assertEqual(sorted(bitboard.generate_moves(color)), expected)
+
+    def test_is_attacked(self):
+        for board in self.boards:
+            bitboard = BitBoard.from_board(board)
+            for column in range(8):
+                for line in range(8):
+                    for color in colors:
+                        self.assertEqual(bitboard.is_attacked(column, line, color),
+                                         board.is_attacked(column, line, color))
+
+    def test_board_round_trip(self):
+        for board in self.boards:
+            bitboard = BitBoard.from_board(board)
+            self.assertEqual(get_pieces(bitboard), get_pieces(board))
+            self.assertEqual(get_pieces(bitboard.to_board()), get_pieces(board))
+            self.assertEqual(BitBoard.from_board(bitboard.to_board()), bitboard)
+
+
+if __name__ == '__main__':
+    unittest.main()
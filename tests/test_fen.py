@@ -0,0 +1,49 @@
+import unittest
+
+from source import Game
+from source.perft import reference_positions
+from source.moves import en_passant_flag, move_mask, encode
+
+
+class FenTest(unittest.TestCase):
+    def test_en_passant_square(self):
+        fen = "rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+        game = Game.from_fen(fen)
+        self.assertEqual(game.board.get(4, 4).type, "pawn")
+        capture = encode((3, 4), (4, 5))
+        en_passant_moves = [move for move in game.legal_moves() if move & en_passant_flag]
+        self.assertEqual([move & move_mask for move in en_passant_moves], [capture])
+        self.assertEqual(game.to_fen(), fen)
+
+    def test_double_push_round_trip(self):
+        game = Game()
+        game.init_new_game_board()
+        game.play(encode((4, 6), (4, 4)))
+        fen = game.to_fen()
+        self.assertEqual(fen, "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+        self.assertEqual(Game.from_fen(fen).to_fen(), fen)
+
+    def test_round_trip(self):
+        fens = [fen for fen, nodes in reference_positions.values()]
+        fens += ["r3k2r/8/8/8/4Pp2/8/8/R3K2R b Kq e3 12 40",
+                 "4k2r/8/8/2pP4/8/8/8/R3K3 w Qk c6 0 23",
+                 "4k3/8/8/8/8/8/8/4K3 w - - 99 150"]
+        for fen in fens:
+            with self.subTest(fen=fen):
+                self.assertEqual(Game.from_fen(fen).to_fen(), fen)
+
+    def test_round_trip_after_each_move(self):
+        # Castling, a capture, a double push that allows en passant and moves that count for
+        # the halfmove clock
+        game = Game.from_fen("r3k2r/8/8/8/4p3/8/3P4/R3K2R w KQkq - 0 1")
+        moves = [((4, 7), (6, 7)), ((0, 0), (0, 7)), ((5, 7), (0, 7)), ((4, 0), (3, 0)),
+                 ((6, 7), (5, 6)), ((3, 0), (2, 0)), ((3, 6), (3, 4))]
+        for origin, destination in moves:
+            game.play(encode(origin, destination))
+            fen = game.to_fen()
+            self.assertEqual(Game.from_fen(fen).to_fen(), fen)
+        self.assertEqual(game.to_fen(), "2k4r/8/8/8/3Pp3/8/5K2/R7 b - d3 0 4")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+from source import Game
+from source.library import GameLibrary, read_errors
+
+
+class GameLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.library = GameLibrary(self.directory.name)
+
+    def tearDown(self):
+        self.library.close()
+        self.directory.cleanup()
+
+    def test_unreadable_file_is_listed(self):
+        game = Game()
+        game.init_new_game_board()
+        self.library.save("game", game)
+        with open(os.path.join(self.directory.name, "notes.txt"), "w") as notes:
+            notes.write("not a saved game")
+        self.assertEqual(self.library.get_names(), ["game", "notes.txt"])
+        self.assertEqual(self.library.get_summary("game").turn, "white")
+        with self.assertRaises(read_errors):
+            self.library.get_summary("notes.txt")
+
+    def test_hidden_names(self):
+        game = Game()
+        game.init_new_game_board()
+        for name in (".foo", GameLibrary.index_name):
+            with self.assertRaises(ValueError):
+                self.library.save(name, game)
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, ".foo")))
+        # Only the files of the index are hidden
+        self.library.save("game", game)
+        with open(os.path.join(self.directory.name, ".notes"), "w") as notes:
+            notes.write("not a saved game")
+        self.assertEqual(self.library.get_names(), [".notes", "game"])
+        self.assertEqual(self.library.get_summary("game").turn, "white")
+
+
+if __name__ == '__main__':
+    unittest.main()
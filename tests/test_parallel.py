@@ -0,0 +1,49 @@
+import unittest
+
+from source import Game
+from source.moves import encode
+from source.parallel import ParallelSearch, search_root_moves, merge_results
+
+
+class ParallelSearchTest(unittest.TestCase):
+    def test_after_double_push(self):
+        # The workers rebuild the position from its FEN, including the en passant square
+        game = Game()
+        game.init_new_game_board()
+        game.play(encode((4, 6), (4, 4)))
+        fen = game.to_fen()
+        self.assertEqual(Game.from_fen(fen).to_fen(), fen)
+        with ParallelSearch(game, processes=2, max_depth=2) as search:
+            result = search.run()
+        self.assertIn(result.best_move, game.legal_moves())
+        self.assertEqual(result.depth, 2)
+        self.assertEqual(game.to_fen(), fen)
+
+    def test_merge_worker_stopped_before_depth_1(self):
+        # White is a queen down, so every searched move has a negative score, lower than the
+        # default score of a worker that didn't complete any iteration
+        fen = "3qk3/8/8/8/8/8/PPP5/4K3 w - - 0 1"
+        root_moves = Game.from_fen(fen).legal_moves()
+        stopped = search_root_moves((fen, root_moves[::2], 2, None, 1, 1))
+        finished = search_root_moves((fen, root_moves[1::2], 2, None, None, 1))
+        self.assertEqual(stopped[1], [])
+        result = merge_results([stopped, finished])
+        self.assertEqual(result.depth, 2)
+        self.assertEqual(result.best_move, finished[0])
+        self.assertEqual(result.score, finished[1][-1][1])
+        self.assertLess(result.score, 0)
+        self.assertEqual(result.nodes, stopped[2] + finished[2])
+
+    def test_merge_lowest_common_depth(self):
+        fen = "3qk3/8/8/8/8/8/PPP5/4K3 w - - 0 1"
+        root_moves = Game.from_fen(fen).legal_moves()
+        shallow = search_root_moves((fen, root_moves[::2], 1, None, None, 1))
+        deep = search_root_moves((fen, root_moves[1::2], 3, None, None, 1))
+        result = merge_results([shallow, deep])
+        self.assertEqual(result.depth, 1)
+        expected = max(shallow[1][0], deep[1][0], key=lambda iteration: iteration[1])
+        self.assertEqual((result.best_move, result.score), expected[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
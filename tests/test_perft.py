@@ -0,0 +1,21 @@
+import unittest
+
+from source import Game
+from source.perft import reference_positions
+
+# python -m source.perft runs the deeper counts
+max_depth = 3
+
+
+class PerftTest(unittest.TestCase):
+    def test_reference_positions(self):
+        for name, (fen, expected_nodes) in reference_positions.items():
+            game = Game.from_fen(fen)
+            for depth, expected in enumerate(expected_nodes[:max_depth], 1):
+                with self.subTest(name, depth=depth):
+                    self.assertEqual(game.perft(depth), expected)
+            self.assertEqual(game.to_fen(), fen)
+
+
+if __name__ == '__main__':
+    unittest.main()
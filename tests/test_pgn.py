@@ -0,0 +1,28 @@
+import io
+import unittest
+
+from source import pgn
+
+
+class PgnTest(unittest.TestCase):
+    def test_en_passant_suffix(self):
+        text = ('[Event "?"]\n\n'
+                "1. e4 Nf6 2. e5 d5 3. exd6 e.p. {comment} exd6 (3... cxd6) 1-0\n")
+        games = list(pgn.read_games(io.StringIO(text)))
+        self.assertEqual(len(games), 1)
+        self.assertEqual(games[0].moves, ["e4", "Nf6", "e5", "d5", "exd6", "exd6"])
+        game = pgn.replay_game(games[0])
+        self.assertEqual(game.to_fen(),
+                         "rnbqkb1r/ppp2ppp/3p1n2/8/8/8/PPPP1PPP/RNBQKBNR w KQkq - 0 4")
+
+    def test_write_and_read(self):
+        game = pgn.replay_game(next(pgn.read_games(io.StringIO("1. f3 e5 2. g4 Qh4# 0-1\n"))))
+        text = pgn.to_pgn(game)
+        self.assertIn("1. f3 e5 2. g4 Qh4# 0-1", text)
+        self.assertIn('[Result "0-1"]', text)
+        self.assertEqual(pgn.replay_game(next(pgn.read_games(io.StringIO(text)))).to_fen(),
+                         game.to_fen())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from source import Game
+from source.library import GameLibrary
+from source.moves import encode
+
+
+class SaveFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.library = GameLibrary(self.directory.name)
+
+    def tearDown(self):
+        self.library.close()
+        self.directory.cleanup()
+
+    def test_old_text_save_with_en_passant_pawn(self):
+        game = Game()
+        game.init_new_game_board()
+        game.play(encode((4, 6), (4, 4)))
+        fen = game.to_fen()
+        # Save written by the old version, a Python list converted to text
+        with open(os.path.join(self.directory.name, "old"), "w") as game_file:
+            game_file.write(game.get_game_data())
+        migrated = self.library.load("old")
+        self.assertEqual(migrated.to_fen(), fen)
+        self.library.save("new", migrated)
+        loaded = self.library.load("new")
+        self.assertEqual(loaded.to_fen(), fen)
+        self.assertEqual(self.library.get_summary("new").turn, "black")
+        loaded.play(encode((3, 1), (3, 3)))
+        self.library.save("new", loaded)
+        self.assertEqual(self.library.load("new").to_fen(), loaded.to_fen())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from source import Game
+from source.moves import get_move_name, encode
+from source.search import Search, mate_score
+
+
+class SearchTest(unittest.TestCase):
+    def test_mate_in_one(self):
+        game = Game.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        result = Search(game, max_depth=3).run()
+        self.assertEqual(get_move_name(result.best_move), "a1a8")
+        self.assertEqual(result.score, mate_score - 1)
+        self.assertEqual(result.principal_variation, [result.best_move])
+
+    def test_game_unchanged(self):
+        game = Game()
+        game.init_new_game_board()
+        for origin, destination in [((4, 6), (4, 4)), ((3, 1), (3, 3)), ((6, 7), (5, 5))]:
+            game.play(encode(origin, destination))
+        fen, history = game.to_fen(), game.history
+        played_moves = game.get_played_moves()
+        Search(game, max_depth=3).run()
+        self.assertEqual(game.to_fen(), fen)
+        self.assertEqual(game.history, history)
+        self.assertEqual(game.get_played_moves(), played_moves)
+
+    def test_node_limit(self):
+        game = Game()
+        game.init_new_game_board()
+        result = Search(game, node_limit=500).run()
+        self.assertLessEqual(result.nodes, 500)
+        self.assertIn(result.best_move, game.legal_moves())
+        self.assertEqual(len(result.iterations), result.depth)
+
+    def test_time_limit(self):
+        game = Game()
+        game.init_new_game_board()
+        result = Search(game, time_limit=0.2).run()
+        self.assertLess(result.time, 0.7)
+        self.assertIn(result.best_move, game.legal_moves())
+        self.assertGreaterEqual(result.depth, 1)
+
+    def test_stalemate(self):
+        game = Game.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+        result = Search(game, max_depth=3).run()
+        self.assertIsNone(result.best_move)
+        self.assertEqual(result.score, 0)
+        self.assertEqual(result.depth, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from source import Game
+from source.perft import reference_positions
+from source.search import Search
+from source.transposition import TranspositionTable, exact_bound, lower_bound
+
+
+class TranspositionTableTest(unittest.TestCase):
+    def test_replacement(self):
+        # Keys 1 and 3 share the bucket 1 of a table with two buckets
+        table = TranspositionTable(2 * 2 * 200 / 2 ** 20)
+        self.assertEqual(table.bucket_count, 2)
+        table.store(1, 5, 10, exact_bound, "deep")
+        table.store(3, 2, 20, lower_bound, "shallow")
+        self.assertEqual(table.probe(1), (1, 5, 10, exact_bound, "deep"))
+        self.assertEqual(table.probe(3), (3, 2, 20, lower_bound, "shallow"))
+        # A deeper store replaces the first entry, the shallower one stays in the second
+        table.store(3, 6, 30, exact_bound, "deeper")
+        self.assertEqual(table.probe(3)[1:], (6, 30, exact_bound, "deeper"))
+        self.assertIsNone(table.probe(1))
+
+    def test_statistics(self):
+        table = TranspositionTable(0.0001)
+        self.assertEqual(table.bucket_count, 1)
+        self.assertIsNone(table.probe(1))
+        table.store(1, 3, 0, exact_bound, None)
+        table.store(2, 1, 0, exact_bound, None)
+        table.store(3, 1, 0, exact_bound, None)
+        self.assertIsNotNone(table.probe(1))
+        self.assertIsNotNone(table.probe(3))
+        self.assertIsNone(table.probe(2))
+        statistics = table.get_statistics()
+        self.assertEqual(statistics["hits"], 2)
+        self.assertEqual(statistics["misses"], 2)
+        self.assertEqual(statistics["collisions"], 1)
+        self.assertEqual(statistics["hit_rate"], 0.5)
+        self.assertEqual(statistics["stores"], 3)
+        self.assertEqual(statistics["overwrites"], 1)
+        self.assertEqual(statistics["used"], 1.0)
+
+    def test_clear(self):
+        table = TranspositionTable(0.0001)
+        table.store(1, 3, 0, exact_bound, None)
+        table.probe(1)
+        table.probe(2)
+        table.clear()
+        self.assertIsNone(table.probe(1))
+        statistics = table.get_statistics()
+        self.assertEqual(statistics["used"], 0.0)
+        self.assertEqual((statistics["hits"], statistics["misses"], statistics["collisions"]),
+                         (0, 1, 0))
+        self.assertEqual((statistics["stores"], statistics["overwrites"]), (0, 0))
+
+    def test_size_doesnt_change_result(self):
+        for name, (fen, counts) in reference_positions.items():
+            if name == "kiwipete":
+                continue  # Too slow for the test suite at this depth
+            with self.subTest(name):
+                results = []
+                for size in (0.0001, 16):
+                    game = Game.from_fen(fen)
+                    table = TranspositionTable(size)
+                    result = Search(game, max_depth=3, transposition_table=table).run()
+                    results.append((result.best_move, result.score))
+                self.assertEqual(results[0], results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()